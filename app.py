@@ -3,21 +3,34 @@ M&A Valuation Dashboard - Main Application
 Professional DCF analysis tool for enterprise valuation
 """
 
+import functools
+import os
+
 import streamlit as st
-import numpy as np
 
-from models import DCFModel
+from models import DCFModel, ValuationCache, tornado_analysis
+from models.sensitivity import CUBE_AXIS_LABELS, SensitivityCube, default_cube_axes
 from components import (
     apply_custom_css,
     render_header,
     render_metrics,
     render_insights,
     render_footer,
+    render_diagnostics,
     create_revenue_ebit_chart,
     create_waterfall_chart,
-    create_sensitivity_heatmap
+    create_sensitivity_heatmap,
+    create_tornado_chart
+)
+from utils import (
+    RECORDER,
+    cache_counts,
+    collect_user_inputs,
+    counted_cache_data,
+    get_theme_toggle,
+    read_theme,
+    read_user_inputs
 )
-from utils import collect_user_inputs, get_theme_toggle
 
 
 # Page configuration
@@ -28,69 +41,279 @@ st.set_page_config(
 )
 
 
-def main():
-    """Main application logic"""
-    
-    # Get theme selection
-    theme = get_theme_toggle()
-    
-    # Apply custom styling
-    apply_custom_css(theme)
-    
-    # Render header
-    render_header(theme)
-    
-    # Collect user inputs
-    model_params = collect_user_inputs()
-    
-    # Initialize and run DCF model
-    dcf_model = DCFModel(**model_params)
-    results = dcf_model.run_valuation()
-    
-    # Add current revenue to results for metrics display
-    results['current_revenue'] = model_params['current_revenue']
-    
-    # Render key metrics
+HEATMAP_AXIS_FORMATS = {
+    'current_revenue': "${:.0f}M",
+    'growth_shift': "{:+.1%}"
+}
+
+# Model inputs each dashboard section reads. Changing an input reruns only
+# the sections that list it; theme and forecast horizon rerun everything
+VALUATION_INPUTS = frozenset({
+    'current_revenue', 'growth_rates', 'ebit_margin', 'tax_rate', 'wacc', 'terminal_growth',
+    'fcf_conversion', 'forecast_years', 'mid_year', 'stub_fraction'
+})
+SECTION_INPUTS = {
+    'metrics': VALUATION_INPUTS,
+    'revenue_chart': frozenset({'current_revenue', 'growth_rates', 'ebit_margin', 'forecast_years'}),
+    'waterfall_chart': VALUATION_INPUTS,
+    'sensitivity_chart': VALUATION_INPUTS,
+    'tornado_chart': VALUATION_INPUTS,
+    'insights': VALUATION_INPUTS
+}
+FULL_RERUN_INPUTS = frozenset({'forecast_years'})
+
+# Figures are cached on their data plus theme, so a theme flip reuses the
+# cached valuation and only rebuilds (re-styles) the figures once per theme
+FIGURE_CACHE_TTL = 3600
+FIGURE_CACHE_ENTRIES = 64
+
+figure_cache = counted_cache_data(ttl=FIGURE_CACHE_TTL, max_entries=FIGURE_CACHE_ENTRIES)
+revenue_ebit_figure = figure_cache(create_revenue_ebit_chart)
+waterfall_figure = figure_cache(create_waterfall_chart)
+sensitivity_heatmap_figure = figure_cache(create_sensitivity_heatmap)
+tornado_figure = figure_cache(create_tornado_chart)
+
+
+@st.cache_resource
+def get_result_cache() -> ValuationCache:
+    """
+    Process-wide valuation cache shared by every session
+    Set VALUATION_CACHE_DIR to share results between server processes on disk;
+    entries age out with the figures built from them
+    """
+    return ValuationCache(disk_dir=os.environ.get("VALUATION_CACHE_DIR"), ttl=FIGURE_CACHE_TTL)
+
+
+def get_dcf_model(model_params: dict) -> DCFModel:
+    """
+    Return this session's incremental DCF model updated to the current inputs
+    Reruns recompute only the valuation stages affected by changed inputs
+    """
+    dcf_model = st.session_state.get('dcf_model')
+    if dcf_model is None:
+        dcf_model = DCFModel(**model_params, incremental=True)
+        st.session_state['dcf_model'] = dcf_model
+    else:
+        dcf_model.update(**model_params)
+    return dcf_model
+
+
+def build_sensitivity_cube(model_params: dict) -> SensitivityCube:
+    """Sensitivity cube over the dashboard axes, evaluated before it is cached"""
+    return SensitivityCube(model_params, default_cube_axes(model_params)).evaluate()
+
+
+def cache_report() -> dict:
+    """Calls, computations and avoided recomputations for every cache the app uses"""
+    metrics = get_result_cache().metrics
+    report = {
+        'valuation results': {
+            'calls': metrics['hits'] + metrics['misses'],
+            'computed': metrics['misses'],
+            'avoided': metrics['hits']
+        }
+    }
+    report.update(cache_counts())
+    return report
+
+
+def diagnostics_enabled() -> bool:
+    """
+    Rerun timing is opt-in: set VALUATION_DIAGNOSTICS=1 for the server or
+    open the app with ?diagnostics=1
+    """
+    return os.environ.get("VALUATION_DIAGNOSTICS") == "1" or st.query_params.get("diagnostics") == "1"
+
+
+def rerun_dependent_sections():
+    """
+    Input widget callback: rerun only the sections that read a changed input
+    The sidebar, header, CSS and unaffected charts are left as they are.
+    Returning without st.rerun falls back to the normal full-app rerun.
+    """
+    previous = st.session_state.get('model_params')
+    current = read_user_inputs()
+    if previous is None:
+        return
+    changed = {name for name, value in current.items() if previous.get(name) != value}
+    if not changed or changed & FULL_RERUN_INPUTS:
+        return
+    st.session_state['model_params'] = current
+    sections = [key for key, inputs in SECTION_INPUTS.items() if inputs & changed]
+    if diagnostics_enabled():
+        sections.append('diagnostics')
+    st.rerun(sections)
+
+
+def section(key: str):
+    """
+    Decorator making a dashboard section a keyed fragment
+    Fragments rerun with the arguments of the last full run, so sections
+    take none and read inputs from session state instead. Widgets inside a
+    section rerun just that section.
+    """
+    def decorator(render):
+        @st.fragment(key=key)
+        @functools.wraps(render)
+        def fragment():
+            with RECORDER.rerun(enabled=diagnostics_enabled(), kind=key), RECORDER.span(key):
+                render(st.session_state['model_params'], read_theme())
+        return fragment
+    return decorator
+
+
+def current_valuation(model_params: dict):
+    """This session's DCF model and the (cached) valuation for `model_params`"""
+    with RECORDER.span("valuation"):
+        dcf_model = get_dcf_model(model_params)
+        results = get_result_cache().get_or_compute(model_params, dcf_model.run_valuation)
+    return dcf_model, results
+
+
+@section('metrics')
+def metrics_section(model_params: dict, theme: str):
+    _, results = current_valuation(model_params)
     render_metrics(results, theme)
-    
     st.divider()
-    
-    # Chart 1: Revenue & EBIT Projection
+
+
+@section('revenue_chart')
+def revenue_chart_section(model_params: dict, theme: str):
+    _, results = current_valuation(model_params)
     st.subheader("Revenue & EBIT Projection")
-    fig1 = create_revenue_ebit_chart(
-        model_params['current_revenue'],
-        results['revenues'],
-        results['ebits'],
-        theme
-    )
-    st.plotly_chart(fig1, width="stretch")
-    
-    # Chart 2: Valuation Waterfall
+    with RECORDER.span("build"):
+        fig = revenue_ebit_figure(
+            model_params['current_revenue'],
+            results['revenues'],
+            results['ebits'],
+            theme
+        )
+    with RECORDER.span("plotly_chart"):
+        st.plotly_chart(fig, width="stretch")
+
+
+@section('waterfall_chart')
+def waterfall_chart_section(model_params: dict, theme: str):
+    _, results = current_valuation(model_params)
     st.subheader("Valuation Waterfall")
-    fig2 = create_waterfall_chart(
-        results['pv_fcfs'],
-        results['pv_terminal_value'],
-        results['enterprise_value'],
-        theme
-    )
-    st.plotly_chart(fig2, width="stretch")
-    
-    # Chart 3: Sensitivity Analysis
+    with RECORDER.span("build"):
+        fig = waterfall_figure(
+            results['pv_fcfs'],
+            results['pv_terminal_value'],
+            results['enterprise_value'],
+            theme
+        )
+    with RECORDER.span("plotly_chart"):
+        st.plotly_chart(fig, width="stretch")
+
+
+@section('sensitivity_chart')
+def sensitivity_chart_section(model_params: dict, theme: str):
     st.subheader("Sensitivity Analysis: Enterprise Value")
     
-    wacc_range = np.linspace(0.06, 0.14, 9)
-    tg_range = np.linspace(0.02, 0.05, 7)
+    with RECORDER.span("cube"):
+        cube = get_result_cache().get_or_compute(
+            model_params,
+            lambda: build_sensitivity_cube(model_params),
+            namespace='cube'
+        )
     
-    sensitivity_matrix = dcf_model.sensitivity_analysis(wacc_range, tg_range)
+    # Changing an axis reruns only this section
+    axis_names = cube.axis_names
+    col_x, col_y = st.columns(2)
+    with col_x:
+        x_axis = st.selectbox(
+            "Heatmap X Axis",
+            options=axis_names,
+            index=axis_names.index('wacc'),
+            format_func=CUBE_AXIS_LABELS.get
+        )
+    with col_y:
+        y_options = [name for name in axis_names if name != x_axis]
+        y_axis = st.selectbox(
+            "Heatmap Y Axis",
+            options=y_options,
+            index=y_options.index('terminal_growth') if 'terminal_growth' in y_options else 0,
+            format_func=CUBE_AXIS_LABELS.get
+        )
     
-    fig3 = create_sensitivity_heatmap(sensitivity_matrix, wacc_range, tg_range, theme)
-    st.plotly_chart(fig3, width="stretch")
+    with RECORDER.span("build"):
+        fig = sensitivity_heatmap_figure(
+            cube.slice(x_axis, y_axis),
+            cube.axes[x_axis],
+            cube.axes[y_axis],
+            theme,
+            x_title=CUBE_AXIS_LABELS[x_axis],
+            y_title=CUBE_AXIS_LABELS[y_axis],
+            x_format=HEATMAP_AXIS_FORMATS.get(x_axis, "{:.1%}"),
+            y_format=HEATMAP_AXIS_FORMATS.get(y_axis, "{:.1%}")
+        )
+    with RECORDER.span("plotly_chart"):
+        st.plotly_chart(fig, width="stretch")
+
+
+@section('tornado_chart')
+def tornado_chart_section(model_params: dict, theme: str):
+    st.subheader("Tornado Analysis: ±10% Input Shifts")
     
-    # Render insights
-    render_insights(results, model_params, theme)
+    with RECORDER.span("tornado"):
+        tornado = get_result_cache().get_or_compute(
+            model_params,
+            lambda: tornado_analysis(model_params, delta=0.10),
+            namespace='tornado'
+        )
+    
+    with RECORDER.span("build"):
+        fig = tornado_figure(tornado, theme)
+    with RECORDER.span("plotly_chart"):
+        st.plotly_chart(fig, width="stretch")
+
+
+@section('insights')
+def insights_section(model_params: dict, theme: str):
+    dcf_model, results = current_valuation(model_params)
+    with RECORDER.span("wacc_sensitivity"):
+        wacc_sensitivity, _ = dcf_model.calculate_wacc_sensitivity(results)
+    render_insights(results, model_params, wacc_sensitivity, theme)
+
+
+@st.fragment(key='diagnostics')
+def diagnostics_section():
+    export = RECORDER.export(os.environ.get("VALUATION_DIAGNOSTICS_FILE"))
+    render_diagnostics(RECORDER.stage_stats(), export, cache_report())
+
+
+def main():
+    """Main application logic"""
+    diagnostics = diagnostics_enabled()
+    with RECORDER.rerun(enabled=diagnostics):
+        with RECORDER.span("inputs"):
+            # Get theme selection
+            theme = get_theme_toggle()
+            
+            # Apply custom styling
+            apply_custom_css(theme)
+            
+            # Render header
+            render_header(theme)
+            
+            # Collect user inputs; sections read them back from session state
+            st.session_state['model_params'] = collect_user_inputs(on_change=rerun_dependent_sections)
+        
+        # Dashboard sections, each rerunnable on its own
+        metrics_section()
+        revenue_chart_section()
+        waterfall_chart_section()
+        sensitivity_chart_section()
+        tornado_chart_section()
+        insights_section()
+        
+        # Render footer
+        with RECORDER.span("footer"):
+            render_footer()
     
-    # Render footer
-    render_footer()
+    if diagnostics:
+        diagnostics_section()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""
+Forecast Horizon Benchmark
+How valuation cost scales with the number of projected periods
+
+Run with: python -m benchmarks.bench_horizon
+"""
+
+import numpy as np
+
+from models import DCFModel, BatchDCFEngine
+from benchmarks.common import time_call, format_seconds
+
+
+HORIZONS = [5, 30, 120]  # Annual periods; only the count matters for cost
+BATCH_SIZE = 10_000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    wacc_range = np.linspace(0.06, 0.14, 9)
+    tg_range = np.linspace(0.02, 0.05, 7)
+
+    print(f"{'periods':>8} {'run_valuation':>14} {'sensitivity 9x7':>16} {f'batch N={BATCH_SIZE:,}':>16}")
+    for horizon in HORIZONS:
+        model = DCFModel(
+            current_revenue=100.0,
+            growth_rates=[0.05] * horizon,
+            ebit_margin=0.20,
+            tax_rate=0.25,
+            wacc=0.10,
+            terminal_growth=0.03
+        )
+        engine = BatchDCFEngine(
+            current_revenue=rng.uniform(50, 500, BATCH_SIZE),
+            growth_rates=rng.uniform(0.0, 0.10, (BATCH_SIZE, horizon)),
+            ebit_margin=rng.uniform(0.10, 0.40, BATCH_SIZE),
+            tax_rate=0.25,
+            wacc=rng.uniform(0.06, 0.14, BATCH_SIZE),
+            terminal_growth=0.03
+        )
+
+        single = time_call(model.run_valuation)['best']
+        grid = time_call(lambda: model.sensitivity_analysis(wacc_range, tg_range))['best']
+        batch = time_call(engine.run_valuation)['best']
+
+        print(f"{horizon:>8} {format_seconds(single):>14} {format_seconds(grid):>16} {format_seconds(batch):>16}")
+
+
+if __name__ == "__main__":
+    main()
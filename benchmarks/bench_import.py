@@ -0,0 +1,100 @@
+"""
+Import-Time Budget
+Cold-start cost of the engine, chart/UI and app layers, each in a fresh interpreter
+
+Run with: python -m benchmarks.bench_import [--repeat N]
+Exits non-zero when a target goes over its time budget or loads a module it
+should not, so it can gate CI and worker images.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.common import format_seconds
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median seconds to import each target, interpreter startup excluded
+BUDGETS = {
+    'models': 0.02,
+    'models.cli': 1.0,
+    'components': 0.02,
+    'utils': 0.02,
+    'app': 1.0
+}
+
+# Modules that must stay out of each target's import graph
+FORBIDDEN = {
+    'models': ('numpy', 'pandas', 'pyarrow', 'streamlit', 'plotly'),
+    'models.cli': ('streamlit', 'plotly'),
+    'components': ('numpy', 'streamlit', 'plotly'),
+    'utils': ('streamlit', 'plotly'),
+    'app': ('plotly.express', 'plotly.subplots', 'plotly.graph_objs._figure')
+}
+
+PROBE = """
+import json, sys, time, warnings
+warnings.simplefilter('ignore')
+start = time.perf_counter()
+import {target}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def measure(target: str) -> Dict:
+    """Import `target` once in a new interpreter; returns seconds and loaded modules"""
+    completed = subprocess.run(
+        [sys.executable, '-c', PROBE.format(target=target)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    # Streamlit logs to stderr when imported outside `streamlit run`
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check(target: str, repeat: int) -> Dict:
+    """Median import time over `repeat` cold starts plus any forbidden modules loaded"""
+    runs = [measure(target) for _ in range(repeat)]
+    modules = set(runs[-1]['modules'])
+    loaded = [name for name in FORBIDDEN.get(target, ()) if name in modules]
+    seconds = statistics.median(run['seconds'] for run in runs)
+    return {
+        'seconds': seconds,
+        'budget': BUDGETS[target],
+        'forbidden': loaded,
+        'ok': seconds <= BUDGETS[target] and not loaded
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Cold starts per target")
+    parser.add_argument('targets', nargs='*', default=list(BUDGETS), help=f"Any of: {', '.join(BUDGETS)}")
+    args = parser.parse_args(argv)
+    unknown = [target for target in args.targets if target not in BUDGETS]
+    if unknown:
+        parser.error(f"no budget for {', '.join(unknown)}")
+
+    failed = False
+    print(f"{'target':<14} {'median':>10} {'budget':>10}  status")
+    for target in args.targets:
+        result = check(target, args.repeat)
+        status = "ok" if result['ok'] else "OVER BUDGET"
+        if result['forbidden']:
+            status = f"loads {', '.join(result['forbidden'])}"
+        print(f"{target:<14} {format_seconds(result['seconds']):>10} {format_seconds(result['budget']):>10}  {status}")
+        failed |= not result['ok']
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
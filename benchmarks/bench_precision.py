@@ -0,0 +1,112 @@
+"""
+Precision Benchmark
+Throughput, memory and accuracy of float32 against the float64 reference
+
+Run with: python -m benchmarks.bench_precision
+"""
+
+import tracemalloc
+
+import numpy as np
+
+from models import BatchDCFEngine, MonteCarloEngine, Distribution, SensitivityCube
+from benchmarks.common import BASE_PARAMS, time_call, format_seconds
+
+
+BATCH_SIZE = 1_000_000
+YEARS = 10
+MC_DRAWS = 2_000_000
+
+
+def peak_memory(func) -> int:
+    """Peak bytes allocated by numpy while running `func`"""
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def relative_error(values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Finite relative errors of `values` against `reference`"""
+    error = np.abs(values.astype(np.float64) - reference) / np.abs(reference)
+    return error[np.isfinite(error)]
+
+
+def report(name: str, timings: dict, memory: dict, error: np.ndarray):
+    """Print one row per dtype plus the float32 error summary"""
+    for dtype in ('float64', 'float32'):
+        print(
+            f"{name:<22} {dtype:>8} {format_seconds(timings[dtype]):>10} "
+            f"{memory[dtype] / 2 ** 20:>9.1f} MB"
+        )
+    speedup = timings['float64'] / timings['float32']
+    saving = 1 - memory['float32'] / memory['float64']
+    print(
+        f"{'':<22} float32 speedup {speedup:.2f}x, memory -{saving:.0%}, "
+        f"rel. error max {error.max():.1e} / p99 {np.percentile(error, 99):.1e} / median {np.median(error):.1e}"
+    )
+
+
+def bench_batch():
+    rng = np.random.default_rng(0)
+    inputs = {
+        'current_revenue': rng.uniform(50, 500, BATCH_SIZE),
+        'growth_rates': rng.uniform(0.0, 0.10, (BATCH_SIZE, YEARS)),
+        'ebit_margin': rng.uniform(0.10, 0.40, BATCH_SIZE),
+        'tax_rate': 0.25,
+        'wacc': rng.uniform(0.06, 0.14, BATCH_SIZE),
+        'terminal_growth': rng.uniform(0.01, 0.04, BATCH_SIZE)
+    }
+    engines = {dtype: BatchDCFEngine(dtype=dtype, **inputs) for dtype in ('float64', 'float32')}
+    timings = {dtype: time_call(engine.enterprise_value, repeat=3)['best'] for dtype, engine in engines.items()}
+    memory = {dtype: peak_memory(engine.enterprise_value) for dtype, engine in engines.items()}
+    error = relative_error(engines['float32'].enterprise_value(), engines['float64'].enterprise_value())
+    report(f"batch N={BATCH_SIZE:,}", timings, memory, error)
+
+
+def bench_monte_carlo():
+    overrides = {
+        'wacc': Distribution.normal(0.10, 0.01, low=0.05),
+        'terminal_growth': Distribution.uniform(0.02, 0.04),
+        'ebit_margin': Distribution.triangular(0.15, 0.20, 0.25)
+    }
+    engines = {
+        dtype: MonteCarloEngine.from_model_params(BASE_PARAMS, overrides, dtype=dtype, hist_range=(0, 600))
+        for dtype in ('float64', 'float32')
+    }
+    timings = {dtype: time_call(lambda: engine.run(MC_DRAWS, seed=0), repeat=2)['best'] for dtype, engine in engines.items()}
+    memory = {dtype: peak_memory(lambda: engine.run(MC_DRAWS, seed=0)) for dtype, engine in engines.items()}
+    results = {dtype: engine.run(MC_DRAWS, seed=0) for dtype, engine in engines.items()}
+    error = relative_error(
+        np.array([results['float32']['mean']] + list(results['float32']['percentiles'].values())),
+        np.array([results['float64']['mean']] + list(results['float64']['percentiles'].values()))
+    )
+    report(f"monte carlo {MC_DRAWS:,}", timings, memory, error)
+
+
+def bench_cube():
+    axes = {
+        'wacc': np.linspace(0.06, 0.14, 41),
+        'terminal_growth': np.linspace(0.01, 0.05, 41),
+        'growth_shift': np.linspace(-0.04, 0.04, 41),
+        'ebit_margin': np.linspace(0.10, 0.30, 21),
+        'fcf_conversion': np.linspace(0.6, 1.0, 21)
+    }
+    evaluate = {dtype: (lambda dtype=dtype: SensitivityCube(BASE_PARAMS, axes, dtype=dtype).values) for dtype in ('float64', 'float32')}
+    timings = {dtype: time_call(func, repeat=2)['best'] for dtype, func in evaluate.items()}
+    memory = {dtype: peak_memory(func) for dtype, func in evaluate.items()}
+    error = relative_error(evaluate['float32'](), evaluate['float64']())
+    cells = int(np.prod([len(values) for values in axes.values()]))
+    report(f"cube {cells:,} cells", timings, memory, error)
+
+
+def main():
+    print(f"{'workload':<22} {'dtype':>8} {'time':>10} {'peak mem':>12}")
+    bench_batch()
+    bench_monte_carlo()
+    bench_cube()
+
+
+if __name__ == "__main__":
+    main()
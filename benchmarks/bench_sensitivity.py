@@ -0,0 +1,65 @@
+"""
+Sensitivity Analysis Benchmark
+How DCFModel.sensitivity_analysis scales with grid size
+
+Run with: python -m benchmarks.bench_sensitivity
+"""
+
+import numpy as np
+
+from models import DCFModel, SensitivityCube
+from benchmarks.common import BASE_PARAMS, time_call, format_seconds
+
+
+GRID_SIZES = [(9, 7), (50, 50), (100, 100), (250, 250), (500, 500), (1000, 1000)]
+
+
+def reference_sensitivity(model: DCFModel, wacc_range: np.ndarray, tg_range: np.ndarray) -> np.ndarray:
+    """Cell-by-cell double loop, kept as the correctness reference"""
+    fcfs = model.calculate_fcf(model.calculate_nopat(model.calculate_ebit(model.project_revenue())))
+    matrix = np.zeros((len(tg_range), len(wacc_range)))
+    for i, tg in enumerate(tg_range):
+        for j, w in enumerate(wacc_range):
+            dfs = [(1 / (1 + w) ** year) for year in range(1, len(fcfs) + 1)]
+            pv_fcfs = [fcf * df for fcf, df in zip(fcfs, dfs)]
+            matrix[i, j] = sum(pv_fcfs) + fcfs[-1] * (1 + tg) / (w - tg) * dfs[-1]
+    return matrix
+
+
+def main():
+    model = DCFModel(**BASE_PARAMS)
+
+    # Non-uniform axes must match the reference loop
+    wacc_range = np.sort(np.random.default_rng(0).uniform(0.06, 0.14, 37))
+    tg_range = np.geomspace(0.005, 0.05, 23)
+    np.testing.assert_allclose(
+        model.sensitivity_analysis(wacc_range, tg_range),
+        reference_sensitivity(model, wacc_range, tg_range),
+        rtol=1e-12
+    )
+    # A WACC x TG cube shares one growth path across cells and must agree too
+    np.testing.assert_allclose(
+        SensitivityCube(BASE_PARAMS, {'wacc': wacc_range, 'terminal_growth': tg_range}).slice('wacc', 'terminal_growth'),
+        model.sensitivity_analysis(wacc_range, tg_range),
+        rtol=1e-12
+    )
+
+    print(f"{'grid':>12} {'cells':>10} {'vectorized':>12} {'per cell':>10} {'loop':>12}")
+    for n_wacc, n_tg in GRID_SIZES:
+        wacc_range = np.linspace(0.06, 0.14, n_wacc)
+        tg_range = np.linspace(0.02, 0.05, n_tg)
+        cells = n_wacc * n_tg
+
+        fast = time_call(lambda: model.sensitivity_analysis(wacc_range, tg_range))['best']
+        loop = "-"
+        if cells <= 10_000:
+            loop = format_seconds(time_call(
+                lambda: reference_sensitivity(model, wacc_range, tg_range), repeat=3
+            )['best'])
+
+        print(f"{n_wacc:>5} x {n_tg:<4} {cells:>10,} {format_seconds(fast):>12} "
+              f"{format_seconds(fast / cells):>10} {loop:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Separable Sweep Benchmark
+Factorized EV = revenue x margin x (1 - tax) x conversion x G against
+full batch valuation
+
+Run with: python -m benchmarks.bench_separable
+"""
+
+import numpy as np
+
+from models import DCFModel, BatchDCFEngine
+from benchmarks.common import BASE_PARAMS, time_call, format_seconds
+
+
+AXIS_POINTS = 100  # 100^3 = 1M margin x tax x conversion combinations
+
+
+def check_against_run_valuation(n_samples: int = 2000):
+    """Factorized EV must match DCFModel.run_valuation to rounding error"""
+    rng = np.random.default_rng(0)
+    worst = 0.0
+    for _ in range(n_samples):
+        params = {
+            'current_revenue': rng.uniform(1, 10_000),
+            'growth_rates': list(rng.uniform(-0.05, 0.30, 5)),
+            'ebit_margin': rng.uniform(0.05, 0.45),
+            'tax_rate': rng.uniform(0.10, 0.40),
+            'wacc': rng.uniform(0.05, 0.15),
+            'terminal_growth': rng.uniform(0.0, 0.04),
+            'fcf_conversion': rng.uniform(0.5, 1.0)
+        }
+        model = DCFModel(**params)
+        reference = model.run_valuation()['enterprise_value']
+        factorized = model.factorized_sweep(ebit_margin=[params['ebit_margin']])[0]
+        worst = max(worst, abs(factorized / reference - 1))
+    assert worst < 1e-12, f"factorized EV differs from run_valuation by {worst:.2e}"
+    return worst
+
+
+def main():
+    worst = check_against_run_valuation()
+    print(f"max relative difference vs run_valuation: {worst:.2e}")
+
+    model = DCFModel(**BASE_PARAMS)
+    margins = np.linspace(0.10, 0.40, AXIS_POINTS)
+    tax_rates = np.linspace(0.15, 0.35, AXIS_POINTS)
+    conversions = np.linspace(0.60, 1.00, AXIS_POINTS)
+    cells = AXIS_POINTS ** 3
+
+    grid_margin, grid_tax, grid_conversion = (
+        axis.ravel() for axis in np.meshgrid(margins, tax_rates, conversions, indexing='ij')
+    )
+    engine = BatchDCFEngine(
+        current_revenue=BASE_PARAMS['current_revenue'],
+        growth_rates=BASE_PARAMS['growth_rates'],
+        ebit_margin=grid_margin,
+        tax_rate=grid_tax,
+        wacc=BASE_PARAMS['wacc'],
+        terminal_growth=BASE_PARAMS['terminal_growth'],
+        fcf_conversion=grid_conversion
+    )
+
+    factorized = model.factorized_sweep(ebit_margin=margins, tax_rate=tax_rates, fcf_conversion=conversions)
+    np.testing.assert_allclose(factorized.ravel(), engine.enterprise_value(), rtol=1e-12)
+
+    fast = time_call(
+        lambda: model.factorized_sweep(ebit_margin=margins, tax_rate=tax_rates, fcf_conversion=conversions)
+    )['best']
+    batch = time_call(engine.enterprise_value, repeat=3)['best']
+
+    print(f"{cells:,} combinations")
+    print(f"  factorized sweep: {format_seconds(fast):>10} ({format_seconds(fast / cells)} per cell)")
+    print(f"  batch engine:     {format_seconds(batch):>10} ({format_seconds(batch / cells)} per cell)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark Helpers
+Shared timing utilities for the benchmark scripts
+"""
+
+import statistics
+import time
+from typing import Callable, Dict
+
+
+# Model inputs shared by every benchmark that values a single company
+BASE_PARAMS = {
+    'current_revenue': 100.0,
+    'growth_rates': [0.15, 0.12, 0.10, 0.08, 0.06],
+    'ebit_margin': 0.20,
+    'tax_rate': 0.25,
+    'wacc': 0.10,
+    'terminal_growth': 0.03,
+    'fcf_conversion': 0.8
+}
+
+
+def time_call(func: Callable, repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """
+    Time a zero-argument callable
+    Returns best, median and mean seconds per call over `repeat` rounds of `number` calls
+    """
+    func()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        'best': min(timings),
+        'median': statistics.median(timings),
+        'mean': sum(timings) / len(timings)
+    }
+
+
+def format_seconds(seconds: float) -> str:
+    """Format a duration with a readable unit"""
+    if seconds < 1e-6:
+        return f"{seconds * 1e9:.1f} ns"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
@@ -0,0 +1,238 @@
+"""
+Benchmark Harness
+Latency suite over the engine and chart builders with saved baselines
+
+Run with:
+    python -m benchmarks.harness run -o current.json [--batch-sizes 1000,100000]
+    python -m benchmarks.harness compare baseline.json current.json [--threshold 0.15]
+
+`compare` exits 1 when any case is slower than the baseline by more than
+the threshold, so engine changes can be gated on measured latency.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import BatchDCFEngine, DCFModel, ENGINE_VERSION, tornado_analysis
+from components.charts import (
+    create_revenue_ebit_chart,
+    create_sensitivity_heatmap,
+    create_tornado_chart,
+    create_waterfall_chart
+)
+from benchmarks.common import BASE_PARAMS, format_seconds, time_call
+
+
+SCHEMA_VERSION = 1
+
+
+DEFAULT_BATCH_SIZES = (1_000, 100_000)
+DEFAULT_GRID_SIZES = ((9, 7), (41, 41), (201, 201))
+DEFAULT_THRESHOLD = 0.15
+METRICS = ('best', 'median', 'mean')
+
+
+def build_cases(batch_sizes: List[int], grid_sizes: List[Tuple[int, int]]) -> Dict[str, Callable]:
+    """Zero-argument callables keyed by case name, inputs prepared up front"""
+    model = DCFModel(**BASE_PARAMS)
+    results = model.run_valuation()
+    dashboard_grid = (np.linspace(0.08, 0.12, 9), np.linspace(0.02, 0.04, 7))
+    matrix = model.sensitivity_analysis(*dashboard_grid)
+    tornado = tornado_analysis(BASE_PARAMS, delta=0.10)
+
+    cases = {
+        'run_valuation': model.run_valuation,
+        'calculate_wacc_sensitivity': lambda: model.calculate_wacc_sensitivity(results)
+    }
+    for n_wacc, n_tg in grid_sizes:
+        axes = (np.linspace(0.06, 0.14, n_wacc), np.linspace(0.01, 0.05, n_tg))
+        cases[f'sensitivity_analysis[{n_wacc}x{n_tg}]'] = lambda axes=axes: model.sensitivity_analysis(*axes)
+
+    rng = np.random.default_rng(0)
+    for size in batch_sizes:
+        engine = BatchDCFEngine(
+            current_revenue=rng.uniform(50, 500, size),
+            growth_rates=rng.uniform(0.0, 0.15, (size, len(BASE_PARAMS['growth_rates']))),
+            ebit_margin=rng.uniform(0.10, 0.40, size),
+            tax_rate=BASE_PARAMS['tax_rate'],
+            wacc=rng.uniform(0.07, 0.13, size),
+            terminal_growth=rng.uniform(0.01, 0.04, size)
+        )
+        cases[f'batch_run_valuation[N={size}]'] = engine.run_valuation
+
+    cases['create_revenue_ebit_chart'] = lambda: create_revenue_ebit_chart(
+        BASE_PARAMS['current_revenue'], results['revenues'], results['ebits']
+    )
+    cases['create_waterfall_chart'] = lambda: create_waterfall_chart(
+        results['pv_fcfs'], results['pv_terminal_value'], results['enterprise_value']
+    )
+    cases['create_sensitivity_heatmap'] = lambda: create_sensitivity_heatmap(matrix, *dashboard_grid)
+    cases['create_tornado_chart'] = lambda: create_tornado_chart(tornado)
+    return cases
+
+
+def git_commit() -> Optional[str]:
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def machine_metadata() -> Dict:
+    """Enough about the host to tell whether two result files are comparable"""
+    import plotly
+
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'engine_version': ENGINE_VERSION,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'plotly': plotly.__version__
+    }
+
+
+def run(
+    batch_sizes: List[int],
+    grid_sizes: List[Tuple[int, int]],
+    repeat: int = 5,
+    select: Optional[str] = None
+) -> Dict:
+    """Time every case; returns the JSON-ready result document"""
+    cases = build_cases(batch_sizes, grid_sizes)
+    timings = {}
+    for name, func in cases.items():
+        if select and select not in name:
+            continue
+        timings[name] = time_call(func, repeat=repeat)
+        print(f"{name:<36} {format_seconds(timings[name]['best']):>10}", file=sys.stderr)
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'metadata': machine_metadata(),
+        'config': {'batch_sizes': batch_sizes, 'grid_sizes': grid_sizes, 'repeat': repeat},
+        'cases': timings
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD, metric: str = 'best') -> Dict:
+    """
+    Per-case ratio of current to baseline time for cases present in both
+    A case regresses when its ratio exceeds 1 + threshold
+    """
+    rows = {}
+    for name in baseline['cases'].keys() & current['cases'].keys():
+        before = baseline['cases'][name][metric]
+        after = current['cases'][name][metric]
+        ratio = after / before if before else float('inf')
+        rows[name] = {'baseline': before, 'current': after, 'ratio': ratio, 'regressed': ratio > 1 + threshold}
+    return {
+        'cases': rows,
+        'regressions': sorted(name for name, row in rows.items() if row['regressed']),
+        'missing': sorted(baseline['cases'].keys() - current['cases'].keys()),
+        'new': sorted(current['cases'].keys() - baseline['cases'].keys())
+    }
+
+
+def parse_sizes(text: str) -> List[int]:
+    return [int(value) for value in text.split(',') if value]
+
+
+def parse_grids(text: str) -> List[Tuple[int, int]]:
+    return [tuple(int(n) for n in grid.split('x')) for grid in text.split(',') if grid]
+
+
+def load(path: str) -> Dict:
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.harness", description="Valuation latency benchmarks")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Time the suite and save the results as JSON")
+    run_parser.add_argument('-o', '--output', help="JSON file for the results (default: stdout)")
+    run_parser.add_argument(
+        '--batch-sizes', type=parse_sizes, default=list(DEFAULT_BATCH_SIZES),
+        help="Comma-separated BatchDCFEngine row counts"
+    )
+    run_parser.add_argument(
+        '--grid-sizes', type=parse_grids, default=list(DEFAULT_GRID_SIZES),
+        help="Comma-separated sensitivity grids, e.g. 9x7,41x41"
+    )
+    run_parser.add_argument('--repeat', type=int, default=5, help="Timed rounds per case")
+    run_parser.add_argument('-k', '--select', help="Only run cases whose name contains this text")
+
+    compare_parser = commands.add_parser('compare', help="Flag regressions against a saved baseline")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown as a fraction, e.g. 0.15 for 15%%"
+    )
+    compare_parser.add_argument('--metric', choices=METRICS, default='best')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'run':
+        document = json.dumps(run(args.batch_sizes, args.grid_sizes, args.repeat, args.select), indent=2)
+        if args.output:
+            with open(args.output, 'w') as handle:
+                handle.write(document + "\n")
+        else:
+            print(document)
+        return 0
+
+    baseline, current = load(args.baseline), load(args.current)
+    report = compare(baseline, current, args.threshold, args.metric)
+    for label, document in (('baseline', baseline), ('current', current)):
+        metadata = document['metadata']
+        print(f"{label:<9} {metadata['timestamp']}  {(metadata['git_commit'] or '-')[:10]}  {metadata['processor'] or metadata['machine']}")
+    if baseline['metadata']['platform'] != current['metadata']['platform']:
+        print("warning: results come from different platforms", file=sys.stderr)
+
+    print(f"\n{'case':<36} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(report['cases']):
+        row = report['cases'][name]
+        flag = "  REGRESSION" if row['regressed'] else ""
+        print(
+            f"{name:<36} {format_seconds(row['baseline']):>10} {format_seconds(row['current']):>10} "
+            f"{row['ratio'] - 1:>+8.1%}{flag}"
+        )
+    for name in report['missing']:
+        print(f"{name:<36} missing from current run")
+    for name in report['new']:
+        print(f"{name:<36} new, no baseline")
+
+    if report['regressions']:
+        print(f"\n{len(report['regressions'])} case(s) slower than baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,23 @@
-"""Components package"""
-from .charts import create_revenue_ebit_chart, create_waterfall_chart, create_sensitivity_heatmap
-from .ui import apply_custom_css, render_header, render_metrics, render_insights, render_footer
+"""
+Components package
+Charts (Plotly) and UI blocks (Streamlit) load on first access, so importing
+one layer does not pull in the other
+"""
+from utils.lazy import lazy_exports
 
-__all__ = [
-    'create_revenue_ebit_chart',
-    'create_waterfall_chart', 
-    'create_sensitivity_heatmap',
-    'apply_custom_css',
-    'render_header',
-    'render_metrics',
-    'render_insights',
-    'render_footer'
-]
+_EXPORTS = {
+    'create_revenue_ebit_chart': '.charts',
+    'create_waterfall_chart': '.charts',
+    'create_sensitivity_heatmap': '.charts',
+    'create_tornado_chart': '.charts',
+    'apply_custom_css': '.ui',
+    'render_header': '.ui',
+    'render_metrics': '.ui',
+    'render_insights': '.ui',
+    'render_footer': '.ui',
+    'render_diagnostics': '.ui'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
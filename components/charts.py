@@ -1,39 +1,48 @@
 """
 Chart Components
 Plotly visualizations for the valuation dashboard
+
+Plotly is imported inside each chart function: it is the heaviest import in
+the app and nothing else needs it
 """
 
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-from typing import List
+from typing import TYPE_CHECKING, Dict, List
 import numpy as np
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 
 def create_revenue_ebit_chart(
     current_revenue: float,
     projected_revenues: List[float],
     ebits: List[float],
     theme: str = "light"
-) -> go.Figure:
+) -> "go.Figure":
     """
     Create Revenue & EBIT projection chart (combo bar + line)
     """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     bg_color = "white" if theme == "light" else "#1e293b"
     paper_color = "#f5f7fa" if theme == "light" else "#0f172a"
     text_color = "#1f2937" if theme == "light" else "#e5e7eb"
     grid_color = "#e5e7eb" if theme == "light" else "#334155"
     
+    revenues = [current_revenue] + list(projected_revenues)
+    years = len(projected_revenues)
+    
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     
     # Add Revenue bars
     fig.add_trace(
         go.Bar(
-            x=[f"Year {i}" for i in range(6)],
-            y=[current_revenue] + projected_revenues,
+            x=[f"Year {i}" for i in range(years + 1)],
+            y=revenues,
             name="Revenue",
             marker_color="#3b82f6",
-            text=[f"${val:.1f}M" for val in [current_revenue] + projected_revenues],
+            text=[f"${val:.1f}M" for val in revenues],
             textposition="outside",
             hovertemplate="<b>%{x}</b><br>Revenue: $%{y:.1f}M<extra></extra>"
         ),
@@ -43,7 +52,7 @@ def create_revenue_ebit_chart(
     # Add EBIT line
     fig.add_trace(
         go.Scatter(
-            x=[f"Year {i}" for i in range(1, 6)],
+            x=[f"Year {i}" for i in range(1, years + 1)],
             y=ebits,
             name="EBIT",
             mode="lines+markers",
@@ -86,18 +95,21 @@ def create_waterfall_chart(
     pv_terminal_value: float,
     enterprise_value: float,
     theme: str = "light"
-) -> go.Figure:
+) -> "go.Figure":
     """
     Create valuation waterfall chart
     """
+    import plotly.graph_objects as go
+
     bg_color = "white" if theme == "light" else "#1e293b"
     paper_color = "#f5f7fa" if theme == "light" else "#0f172a"
     text_color = "#1f2937" if theme == "light" else "#e5e7eb"
     grid_color = "#e5e7eb" if theme == "light" else "#334155"
     
-    waterfall_measure = ["relative"] * 5 + ["relative", "total"]
-    waterfall_x = [f"Year {i} FCF" for i in range(1, 6)] + ["Terminal Value", "Enterprise Value"]
-    waterfall_y = pv_fcfs + [pv_terminal_value, 0]
+    years = len(pv_fcfs)
+    waterfall_measure = ["relative"] * years + ["relative", "total"]
+    waterfall_x = [f"Year {i} FCF" for i in range(1, years + 1)] + ["Terminal Value", "Enterprise Value"]
+    waterfall_y = list(pv_fcfs) + [pv_terminal_value, 0]
     waterfall_text = [f"${val:.1f}M" for val in pv_fcfs] + [f"${pv_terminal_value:.1f}M", f"${enterprise_value:.1f}M"]
     
     fig = go.Figure(go.Waterfall(
@@ -131,27 +143,35 @@ def create_sensitivity_heatmap(
     sensitivity_matrix: np.ndarray,
     wacc_range: np.ndarray,
     tg_range: np.ndarray,
-    theme: str = "light"
-) -> go.Figure:
+    theme: str = "light",
+    x_title: str = "WACC",
+    y_title: str = "Terminal Growth Rate",
+    x_format: str = "{:.1%}",
+    y_format: str = "{:.1%}"
+) -> "go.Figure":
     """
     Create sensitivity analysis heatmap
+    Defaults to WACC across and terminal growth down; pass titles and
+    formats to plot any other pair of axes
     """
+    import plotly.express as px
+
     bg_color = "white" if theme == "light" else "#1e293b"
     paper_color = "#f5f7fa" if theme == "light" else "#0f172a"
     text_color = "#1f2937" if theme == "light" else "#e5e7eb"
     
     fig = px.imshow(
         sensitivity_matrix,
-        labels=dict(x="WACC", y="Terminal Growth Rate", color="Enterprise Value ($M)"),
-        x=[f"{w:.1%}" for w in wacc_range],
-        y=[f"{tg:.1%}" for tg in tg_range],
+        labels=dict(x=x_title, y=y_title, color="Enterprise Value ($M)"),
+        x=[x_format.format(x) for x in wacc_range],
+        y=[y_format.format(y) for y in tg_range],
         color_continuous_scale="RdYlGn",
         aspect="auto",
         text_auto=".1f"
     )
     
     fig.update_traces(
-        hovertemplate="<b>WACC:</b> %{x}<br><b>Terminal Growth:</b> %{y}<br><b>EV:</b> $%{z:.1f}M<extra></extra>"
+        hovertemplate=f"<b>{x_title}:</b> %{{x}}<br><b>{y_title}:</b> %{{y}}<br><b>EV:</b> $%{{z:.1f}}M<extra></extra>"
     )
     
     fig.update_layout(
@@ -162,3 +182,71 @@ def create_sensitivity_heatmap(
     )
     
     return fig
+
+
+def create_tornado_chart(
+    tornado: Dict,
+    theme: str = "light",
+    max_rows: int = 11
+) -> "go.Figure":
+    """
+    Create tornado chart of one-at-a-time sensitivities
+    Expects the output of models.tornado_analysis (rows sorted by swing)
+    """
+    import plotly.graph_objects as go
+
+    bg_color = "white" if theme == "light" else "#1e293b"
+    paper_color = "#f5f7fa" if theme == "light" else "#0f172a"
+    text_color = "#1f2937" if theme == "light" else "#e5e7eb"
+    grid_color = "#e5e7eb" if theme == "light" else "#334155"
+    
+    base_value = tornado['base_value']
+    # Plotly draws the first category at the bottom, so reverse to put the widest bar on top
+    rows = tornado['rows'][:max_rows][::-1]
+    labels = [row['label'] for row in rows]
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=[row['low_ev'] - base_value for row in rows],
+        base=base_value,
+        orientation="h",
+        name="Input Decreased",
+        marker_color="#ef4444",
+        customdata=[[row['low_input'], row['low_ev']] for row in rows],
+        hovertemplate="<b>%{y}</b><br>Input: %{customdata[0]:.4g}<br>EV: $%{customdata[1]:.1f}M<extra></extra>"
+    ))
+    
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=[row['high_ev'] - base_value for row in rows],
+        base=base_value,
+        orientation="h",
+        name="Input Increased",
+        marker_color="#3b82f6",
+        customdata=[[row['high_input'], row['high_ev']] for row in rows],
+        hovertemplate="<b>%{y}</b><br>Input: %{customdata[0]:.4g}<br>EV: $%{customdata[1]:.1f}M<extra></extra>"
+    ))
+    
+    fig.add_vline(x=base_value, line_dash="dash", line_color="#64748b")
+    
+    fig.update_layout(
+        height=max(300, 40 * len(rows) + 120),
+        barmode="overlay",
+        xaxis_title="Enterprise Value ($M)",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        plot_bgcolor=bg_color,
+        paper_bgcolor=paper_color,
+        font=dict(size=12, color=text_color),
+        xaxis=dict(gridcolor=grid_color),
+        yaxis=dict(gridcolor=grid_color)
+    )
+    
+    return fig
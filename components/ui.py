@@ -4,7 +4,7 @@ Reusable UI elements and styling for the dashboard
 """
 
 import streamlit as st
-from typing import Dict
+from typing import Dict, List, Optional
 
 
 def apply_custom_css(theme: str = "light"):
@@ -126,6 +126,7 @@ def render_metrics(results: Dict, theme: str = "light"):
     enterprise_value = results['enterprise_value']
     pv_forecast_period = results['pv_forecast_period']
     pv_terminal_value = results['pv_terminal_value']
+    years = len(results['pv_fcfs'])
     
     with col1:
         st.metric(
@@ -136,7 +137,7 @@ def render_metrics(results: Dict, theme: str = "light"):
     
     with col2:
         st.metric(
-            label="PV of Cash Flows (Years 1-5)",
+            label=f"PV of Cash Flows (Years 1-{years})",
             value=f"${pv_forecast_period:.1f}M",
             delta=f"{(pv_forecast_period / enterprise_value * 100):.1f}% of Total"
         )
@@ -149,8 +150,12 @@ def render_metrics(results: Dict, theme: str = "light"):
         )
 
 
-def render_insights(results: Dict, model_params: Dict, theme: str = "light"):
-    """Render key insights section"""
+def render_insights(results: Dict, model_params: Dict, wacc_sensitivity: float, theme: str = "light"):
+    """
+    Render key insights section
+    `wacc_sensitivity` is the fractional EV change for a 1% WACC move, from
+    DCFModel.calculate_wacc_sensitivity
+    """
     st.divider()
     st.subheader("Key Insights")
     
@@ -161,6 +166,7 @@ def render_insights(results: Dict, model_params: Dict, theme: str = "light"):
     pv_forecast_period = results['pv_forecast_period']
     projected_revenues = results['revenues']
     ebits = results['ebits']
+    years = len(projected_revenues)
     
     current_revenue = model_params['current_revenue']
     growth_rates = model_params['growth_rates']
@@ -172,28 +178,23 @@ def render_insights(results: Dict, model_params: Dict, theme: str = "light"):
         st.markdown("### Valuation Summary")
         st.markdown(f"""
         - **Enterprise Value**: ${enterprise_value:.1f}M
-        - **Revenue Multiple**: {(enterprise_value / projected_revenues[-1]):.2f}x (EV / Year 5 Revenue)
+        - **Revenue Multiple**: {(enterprise_value / projected_revenues[-1]):.2f}x (EV / Year {years} Revenue)
         - **EBITDA Multiple**: {(enterprise_value / (ebits[-1] * (1/(1-tax_rate)))):.2f}x (estimated)
         - **Terminal Value Contribution**: {(pv_terminal_value / enterprise_value * 100):.1f}%
         - **Forecast Period Contribution**: {(pv_forecast_period / enterprise_value * 100):.1f}%
         """)
         
-        cagr = ((projected_revenues[-1] / current_revenue) ** (1/5) - 1)
+        cagr = ((projected_revenues[-1] / current_revenue) ** (1/years) - 1)
         st.markdown(f"""
         **Growth Profile**:
         - Initial Growth: {growth_rates[0]:.1%} → {growth_rates[-1]:.1%}
         - Terminal Growth: {terminal_growth:.2%}
-        - CAGR (5Y): {cagr:.2%}
+        - CAGR ({years}Y): {cagr:.2%}
         """)
     
     with col_right:
         st.markdown("### Risk Factors & Assumptions")
         
-        # Calculate WACC sensitivity
-        from models.dcf_model import DCFModel
-        model = DCFModel(**model_params)
-        wacc_sensitivity, _ = model.calculate_wacc_sensitivity()
-        
         st.markdown(f"""
         - **WACC Sensitivity**: ±1% change in WACC = ±{wacc_sensitivity*100:.1f}% change in EV
         - **Terminal Value Dependency**: {(pv_terminal_value / enterprise_value * 100):.1f}% of value in terminal period
@@ -213,3 +214,41 @@ def render_footer():
     st.divider()
     st.caption("Built for M&A Analysis | Professional DCF Valuation Tool")
     st.caption("For illustrative purposes only. Consult financial professionals for investment decisions.")
+
+
+def render_diagnostics(stages: List[Dict], export: str, caches: Optional[Dict[str, Dict]] = None):
+    """
+    Render rerun timing diagnostics
+    `stages` is SpanRecorder.stage_stats(); `export` the JSON offered for
+    download; `caches` maps cache name to calls / computed / avoided counts
+    """
+    with st.expander("Diagnostics: rerun timings", expanded=False):
+        if not stages:
+            st.caption("No reruns recorded yet")
+        else:
+            st.dataframe(
+                [
+                    {
+                        'Stage': ("\u00a0" * 4 * row['stage'].count("/")) + row['stage'].rsplit("/", 1)[-1],
+                        'Reruns': row['count'],
+                        'p50 (ms)': round(row['p50_ms'], 2),
+                        'p95 (ms)': round(row['p95_ms'], 2),
+                        'Last (ms)': round(row['last_ms'], 2)
+                    }
+                    for row in stages
+                ],
+                hide_index=True,
+                width="stretch"
+            )
+            st.download_button("Export timings (JSON)", export, file_name="rerun_timings.json", mime="application/json")
+        
+        if caches:
+            st.caption("Caches")
+            st.dataframe(
+                [
+                    {'Cache': name, 'Calls': counts['calls'], 'Computed': counts['computed'], 'Avoided': counts['avoided']}
+                    for name, counts in caches.items()
+                ],
+                hide_index=True,
+                width="stretch"
+            )
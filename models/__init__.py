@@ -1,4 +1,26 @@
-"""Models package"""
-from .dcf_model import DCFModel
+"""
+Models package
+Exports load on first access (PEP 562), so `import models` stays cheap for
+batch workers that only need one engine
+"""
+from utils.lazy import lazy_exports
 
-__all__ = ['DCFModel']
+_EXPORTS = {
+    'DCFModel': '.dcf_model',
+    'ENGINE_VERSION': '.dcf_model',
+    'BatchDCFEngine': '.batch_engine',
+    'ValuationResult': '.results',
+    'MonteCarloEngine': '.monte_carlo',
+    'Distribution': '.monte_carlo',
+    'ValuationCache': '.result_cache',
+    'tornado_analysis': '.sensitivity',
+    'SensitivityCube': '.sensitivity',
+    'factorized_sweep': '.sensitivity',
+    'solve_for_ev': '.solver',
+    'implied_irr': '.irr',
+    'implied_irr_for_batch': '.irr'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
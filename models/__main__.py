@@ -0,0 +1,4 @@
+"""Command-line entry point: python -m models"""
+from .cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,587 @@
+"""
+Batch DCF Engine
+Vectorized DCF calculations for valuing many scenarios in one call
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Union
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+# Precisions the vectorized paths accept; float64 is the reference
+SUPPORTED_DTYPES = (np.float64, np.float32)
+
+# Terminal value methods: Gordon growth, a multiple of final-year EBIT or
+# EBITDA, or a weighted blend of the two
+TERMINAL_METHODS = ('perpetuity', 'exit_multiple', 'blended')
+
+EXIT_METRICS = ('ebit', 'ebitda')
+
+
+class BatchDCFEngine:
+    """
+    Discounted Cash Flow valuation for N scenarios at once
+
+    Scalar inputs are arrays of shape (N,) (plain floats are broadcast),
+    growth rates are an (N, years) matrix. Every calculation is a single
+    array operation across all scenarios, mirroring the steps of DCFModel.
+
+    `dtype` selects float64 (default) or float32. float32 halves memory and
+    bandwidth; EV then carries a relative error of roughly
+    (years + 2 + (wacc + tg) / (wacc - tg)) x 6e-8 against float64, i.e.
+    around 1e-6 for typical inputs, growing as WACC approaches TG.
+
+    `terminal_method` picks how terminal value enters EV. Both the perpetuity
+    and the exit-multiple values (`exit_multiple` x final-year EBIT, or
+    EBITDA = EBIT + `da_margin` x revenue) are always computed in the same
+    pass and returned by run_valuation; 'blended' weights them
+    `blend_weight` : 1 - `blend_weight`.
+
+    `mid_year` discounts each year's cash flow from the middle of its period,
+    and `stub_fraction` < 1 makes the first period a partial year from the
+    valuation date (only that share of year-1 cash flow is counted). Both
+    are shared by every scenario and precomputed once as a per-year time
+    offset vector (see discount_schedule).
+    """
+
+    def __init__(
+        self,
+        current_revenue: ArrayLike,
+        growth_rates: ArrayLike,
+        ebit_margin: ArrayLike,
+        tax_rate: ArrayLike,
+        wacc: ArrayLike,
+        terminal_growth: ArrayLike,
+        fcf_conversion: ArrayLike = 0.8,
+        exit_multiple: ArrayLike = np.nan,
+        da_margin: ArrayLike = 0.0,
+        blend_weight: ArrayLike = 0.5,
+        terminal_method: str = 'perpetuity',
+        exit_metric: str = 'ebit',
+        mid_year: bool = False,
+        stub_fraction: float = 1.0,
+        dtype: np.dtype = np.float64
+    ):
+        check_terminal_method(terminal_method, exit_metric)
+        self.terminal_method = terminal_method
+        self.exit_metric = exit_metric
+        self.dtype = check_dtype(dtype)
+        growth_rates = np.asarray(growth_rates, dtype=self.dtype)
+        if growth_rates.ndim == 1:
+            growth_rates = growth_rates[np.newaxis, :]
+        if growth_rates.ndim != 2:
+            raise ValueError("growth_rates must be a (N, years) matrix")
+
+        scalars = np.broadcast_arrays(
+            *(np.asarray(value, dtype=self.dtype) for value in (
+                current_revenue, ebit_margin, tax_rate, wacc, terminal_growth, fcf_conversion,
+                exit_multiple, da_margin, blend_weight
+            )),
+            np.empty(growth_rates.shape[0], dtype=self.dtype)
+        )[:-1]
+        if scalars[0].ndim != 1:
+            raise ValueError("Scenario inputs must be scalars or arrays of shape (N,)")
+
+        n_scenarios = scalars[0].shape[0]
+        if growth_rates.shape[0] == 1 and n_scenarios > 1:
+            growth_rates = np.broadcast_to(growth_rates, (n_scenarios, growth_rates.shape[1]))
+        elif growth_rates.shape[0] != n_scenarios:
+            raise ValueError(
+                f"growth_rates has {growth_rates.shape[0]} rows but inputs describe {n_scenarios} scenarios"
+            )
+
+        (
+            self.current_revenue,
+            self.ebit_margin,
+            self.tax_rate,
+            self.wacc,
+            self.terminal_growth,
+            self.fcf_conversion,
+            self.exit_multiple,
+            self.da_margin,
+            self.blend_weight
+        ) = scalars
+        self.growth_rates = growth_rates
+        self.mid_year = mid_year
+        self.stub_fraction = stub_fraction
+        self.schedule = discount_schedule(growth_rates.shape[1], mid_year, stub_fraction)
+
+    @property
+    def n_scenarios(self) -> int:
+        """Number of scenarios in the batch"""
+        return self.growth_rates.shape[0]
+
+    @property
+    def years(self) -> int:
+        """Number of projected years"""
+        return self.growth_rates.shape[1]
+
+    @classmethod
+    def from_params(cls, params: Sequence[Dict], dtype: np.dtype = np.float64) -> "BatchDCFEngine":
+        """
+        Build a batch from a list of DCFModel keyword dictionaries
+        The terminal method, exit metric and discounting convention are
+        taken from the first entry
+        """
+        first = params[0] if params else {}
+        return cls(
+            dtype=dtype,
+            terminal_method=first.get('terminal_method', 'perpetuity'),
+            exit_metric=first.get('exit_metric', 'ebit'),
+            mid_year=first.get('mid_year', False),
+            stub_fraction=first.get('stub_fraction', 1.0),
+            exit_multiple=[_or_nan(p.get('exit_multiple')) for p in params],
+            da_margin=[p.get('da_margin', 0.0) for p in params],
+            blend_weight=[p.get('blend_weight', 0.5) for p in params],
+            current_revenue=[p['current_revenue'] for p in params],
+            growth_rates=[p['growth_rates'] for p in params],
+            ebit_margin=[p['ebit_margin'] for p in params],
+            tax_rate=[p['tax_rate'] for p in params],
+            wacc=[p['wacc'] for p in params],
+            terminal_growth=[p['terminal_growth'] for p in params],
+            fcf_conversion=[p.get('fcf_conversion', 0.8) for p in params]
+        )
+
+    def project_revenue(self) -> np.ndarray:
+        """Project revenue for every scenario, shape (N, years)"""
+        # Chain the current revenue through the growth factors so each step
+        # multiplies in the same order as DCFModel.project_revenue
+        chain = np.empty((self.n_scenarios, self.years + 1), dtype=self.dtype)
+        chain[:, 0] = self.current_revenue
+        chain[:, 1:] = 1 + self.growth_rates
+        return np.cumprod(chain, axis=1)[:, 1:]
+
+    def calculate_ebit(self, revenues: np.ndarray) -> np.ndarray:
+        """Calculate EBIT for each scenario and year"""
+        return revenues * self.ebit_margin[:, np.newaxis]
+
+    def calculate_nopat(self, ebits: np.ndarray) -> np.ndarray:
+        """Calculate Net Operating Profit After Tax"""
+        return ebits * (1 - self.tax_rate)[:, np.newaxis]
+
+    def calculate_fcf(self, nopats: np.ndarray) -> np.ndarray:
+        """Calculate Free Cash Flow"""
+        return nopats * self.fcf_conversion[:, np.newaxis]
+
+    def calculate_discount_factors(self) -> np.ndarray:
+        """Calculate discount factors for each scenario and year"""
+        return discount_factor_matrix(self.wacc, self.years, self.dtype, self.schedule['offsets'])
+
+    def calculate_pv_fcf(self, fcfs: np.ndarray, discount_factors: np.ndarray) -> np.ndarray:
+        """Present value of each year's FCF, counting only the stub share of year 1"""
+        return weight_periods(fcfs * discount_factors, self.schedule)
+
+    def calculate_terminal_discount_factor(self, discount_factors: np.ndarray) -> np.ndarray:
+        """Discount factor at the end of the final period, shape (N,)"""
+        return terminal_discount_factor(discount_factors, self.wacc, self.schedule)
+
+    def calculate_exit_metric(self, revenues: np.ndarray, ebits: np.ndarray) -> np.ndarray:
+        """Final-year EBIT or EBITDA the exit multiple applies to, shape (N,)"""
+        if self.exit_metric == 'ebitda':
+            return ebits[:, -1] + revenues[:, -1] * self.da_margin
+        return ebits[:, -1].copy()
+
+    def calculate_terminal_values(self, final_fcf: np.ndarray, final_metric: np.ndarray) -> Dict[str, np.ndarray]:
+        """Perpetuity, exit-multiple and selected terminal values in one pass"""
+        perpetuity = final_fcf * (1 + self.terminal_growth) / (self.wacc - self.terminal_growth)
+        exit_value = final_metric * self.exit_multiple
+        return {
+            'perpetuity': perpetuity,
+            'exit_multiple': exit_value,
+            'selected': select_terminal_value(self.terminal_method, perpetuity, exit_value, self.blend_weight)
+        }
+
+    def calculate_terminal_value(self, final_fcf: np.ndarray, final_metric: Optional[np.ndarray] = None) -> np.ndarray:
+        """Calculate terminal value using the engine's terminal method"""
+        if final_metric is None:
+            final_metric = np.full_like(final_fcf, np.nan)
+        return self.calculate_terminal_values(final_fcf, final_metric)['selected']
+
+    def run_valuation(self) -> Dict[str, np.ndarray]:
+        """
+        Run the DCF valuation for every scenario
+        Returns the same keys as DCFModel.run_valuation with per-year series
+        as (N, years) arrays and scalar outputs as (N,) arrays, plus the
+        perpetuity and exit-multiple terminal values whichever is selected
+        """
+        revenues = self.project_revenue()
+        ebits = self.calculate_ebit(revenues)
+        nopats = self.calculate_nopat(ebits)
+        fcfs = self.calculate_fcf(nopats)
+
+        discount_factors = self.calculate_discount_factors()
+        pv_fcfs = self.calculate_pv_fcf(fcfs, discount_factors)
+
+        terminal_values = self.calculate_terminal_values(fcfs[:, -1], self.calculate_exit_metric(revenues, ebits))
+        terminal_value = terminal_values['selected']
+        pv_terminal_value = terminal_value * self.calculate_terminal_discount_factor(discount_factors)
+
+        pv_forecast_period = pv_fcfs.sum(axis=1)
+        enterprise_value = pv_forecast_period + pv_terminal_value
+
+        return {
+            'revenues': revenues,
+            'ebits': ebits,
+            'nopats': nopats,
+            'fcfs': fcfs,
+            'discount_factors': discount_factors,
+            'pv_fcfs': pv_fcfs,
+            'terminal_value': terminal_value,
+            'pv_terminal_value': pv_terminal_value,
+            'pv_forecast_period': pv_forecast_period,
+            'enterprise_value': enterprise_value,
+            'terminal_value_perpetuity': terminal_values['perpetuity'],
+            'terminal_value_exit_multiple': terminal_values['exit_multiple']
+        }
+
+    def enterprise_value(self) -> np.ndarray:
+        """
+        Enterprise value only, shape (N,)
+        Same arithmetic as run_valuation, but intermediate per-year arrays are
+        released as soon as the next stage is computed
+        """
+        revenues = self.project_revenue()
+        ebits = self.calculate_ebit(revenues)
+        final_metric = self.calculate_exit_metric(revenues, ebits)
+        del revenues
+        fcfs = self.calculate_fcf(self.calculate_nopat(ebits))
+        del ebits
+        discount_factors = self.calculate_discount_factors()
+        pv_terminal_value = (
+            self.calculate_terminal_value(fcfs[:, -1], final_metric)
+            * self.calculate_terminal_discount_factor(discount_factors)
+        )
+        fcfs *= discount_factors
+        fcfs = weight_periods(fcfs, self.schedule)
+        return fcfs.sum(axis=1) + pv_terminal_value
+
+    def discount_kernel(self) -> np.ndarray:
+        """
+        EV per unit of revenue x margin x (1 - tax) x FCF conversion, shape (N,)
+        Depends only on the growth path, WACC and terminal growth. The
+        factorization holds for the perpetuity method only
+        """
+        check_factorizable(self.terminal_method)
+        return discount_kernel(self.growth_rates, self.wacc, self.terminal_growth, self.schedule)
+
+    def calculate_gradients(self, results: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Exact partial derivatives and elasticities of enterprise value
+        Pass the output of run_valuation to avoid re-running it
+        """
+        if results is None:
+            results = self.run_valuation()
+        return ev_gradients(
+            results,
+            current_revenue=self.current_revenue,
+            growth_rates=self.growth_rates,
+            ebit_margin=self.ebit_margin,
+            tax_rate=self.tax_rate,
+            wacc=self.wacc,
+            terminal_growth=self.terminal_growth,
+            fcf_conversion=self.fcf_conversion,
+            perpetuity_share=perpetuity_weight(self.terminal_method, self.blend_weight),
+            exit_multiple=self.exit_multiple if self.terminal_method != 'perpetuity' else None,
+            exit_margin=self.ebit_margin + (self.da_margin if self.exit_metric == 'ebitda' else 0),
+            da_margin=self.da_margin if self.terminal_method != 'perpetuity' and self.exit_metric == 'ebitda' else None,
+            blend_weight=self.blend_weight if self.terminal_method == 'blended' else None,
+            schedule=self.schedule
+        )
+
+
+def ev_gradients(
+    results: Dict[str, np.ndarray],
+    current_revenue: np.ndarray,
+    growth_rates: np.ndarray,
+    ebit_margin: np.ndarray,
+    tax_rate: np.ndarray,
+    wacc: np.ndarray,
+    terminal_growth: np.ndarray,
+    fcf_conversion: np.ndarray,
+    perpetuity_share: ArrayLike = 1.0,
+    exit_multiple: Optional[np.ndarray] = None,
+    exit_margin: Optional[np.ndarray] = None,
+    da_margin: Optional[np.ndarray] = None,
+    blend_weight: Optional[np.ndarray] = None,
+    schedule: Optional[Dict] = None
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Closed-form derivatives of EV for a batch of valuation results
+
+    EV = revenue x (margin x (1 - tax) x conversion x K + multiple x exit
+    margin x X), where K is the PV of the growth index path plus the
+    perpetuity and X the PV of the exit-multiple share of final-year
+    revenue, both per unit of current revenue. Each gradient is the product
+    of the other factors rather than EV divided by the input, so it stays
+    finite where an input is 0 (or tax is 100%). Growth in year k moves
+    the index of year k and every later year; those contributions are
+    accumulated backwards along the path.
+
+    `perpetuity_share` is the share of terminal value taken from the
+    perpetuity formula (see perpetuity_weight). The rest is an exit
+    multiple of final-year revenue x `exit_margin` (the EBIT or EBITDA
+    margin), counted only when `exit_multiple` is given, which also adds
+    its gradient. Pass `da_margin` when the exit metric is EBITDA and
+    `blend_weight` (the perpetuity share) for the blended method to add
+    their gradients; under other settings EV does not depend on them.
+    `results` needs 'discount_factors', 'pv_fcfs',
+    'pv_terminal_value' and 'enterprise_value'; `schedule` is the
+    discounting convention from discount_schedule (integer year ends when
+    omitted).
+
+    Returns {'gradient': ..., 'elasticity': ...}, each keyed by input name
+    with (N,) arrays, or (N, years) for growth_rates.
+    """
+    discount_factors = np.atleast_2d(results['discount_factors'])
+    pv_fcfs = np.atleast_2d(results['pv_fcfs'])
+    pv_terminal_value = np.atleast_1d(results['pv_terminal_value'])
+    enterprise_value = np.atleast_1d(results['enterprise_value'])
+    growth_rates = np.atleast_2d(growth_rates)
+    years = growth_rates.shape[1]
+    if schedule is None:
+        schedule = discount_schedule(years)
+    fcf_margin = ebit_margin * (1 - tax_rate) * fcf_conversion
+    spread = wacc - terminal_growth
+    growth_index = np.cumprod(1 + growth_rates, axis=1)
+    terminal_factor = terminal_discount_factor(discount_factors, wacc, schedule)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # PV of terminal value per unit of final-year revenue and FCF margin
+        # (perpetuity) or exit multiple x margin (exit)
+        perpetuity_factor = perpetuity_share * (1 + terminal_growth) / spread * terminal_factor
+        exit_factor = (1 - perpetuity_share) * terminal_factor if exit_multiple is not None else 0.0
+        exit_rate = exit_multiple * exit_margin if exit_multiple is not None else 0.0
+        kernel = (
+            weight_periods(growth_index * discount_factors, schedule).sum(axis=1)
+            + growth_index[:, -1] * perpetuity_factor
+        )
+        exit_kernel = growth_index[:, -1] * exit_factor
+
+        # EV per unit of each year's growth index, then accumulated from the
+        # final year back: carried[j] sums the later years' index excluding
+        # year j's own growth factor
+        year_value = fcf_margin[:, np.newaxis] * weight_periods(discount_factors, schedule)
+        year_value[:, -1] += fcf_margin * perpetuity_factor + exit_rate * exit_factor
+        carried = np.empty_like(year_value)
+        carried[:, -1] = year_value[:, -1]
+        for year in range(years - 2, -1, -1):
+            carried[:, year] = year_value[:, year] + (1 + growth_rates[:, year + 1]) * carried[:, year + 1]
+        index_before = np.ones_like(growth_index)
+        index_before[:, 1:] = growth_index[:, :-1]
+
+        pv_terminal_perpetuity = current_revenue * fcf_margin * growth_index[:, -1] * perpetuity_factor
+        gradient = {
+            'current_revenue': fcf_margin * kernel + exit_rate * exit_kernel,
+            'growth_rates': current_revenue[:, np.newaxis] * index_before * carried,
+            'ebit_margin': current_revenue * (
+                (1 - tax_rate) * fcf_conversion * kernel
+                + (exit_multiple * exit_kernel if exit_multiple is not None else 0.0)
+            ),
+            'tax_rate': -current_revenue * ebit_margin * fcf_conversion * kernel,
+            'wacc': (
+                -(pv_fcfs @ schedule['times'].astype(pv_fcfs.dtype)) / (1 + wacc)
+                - pv_terminal_value * schedule['terminal_time'] / (1 + wacc)
+                - pv_terminal_perpetuity / spread
+            ),
+            'terminal_growth': (
+                current_revenue * fcf_margin * growth_index[:, -1] * perpetuity_share
+                * terminal_factor * (1 + wacc) / spread ** 2
+            ),
+            'fcf_conversion': current_revenue * ebit_margin * (1 - tax_rate) * kernel
+        }
+        if exit_multiple is not None:
+            gradient['exit_multiple'] = current_revenue * exit_margin * exit_kernel
+        if da_margin is not None:
+            # D&A only moves the exit metric: multiple x revenue x exit share
+            gradient['da_margin'] = current_revenue * exit_multiple * exit_kernel
+        if blend_weight is not None:
+            # PV of the full perpetuity value less PV of the full exit value
+            gradient['blend_weight'] = current_revenue * growth_index[:, -1] * terminal_factor * (
+                fcf_margin * (1 + terminal_growth) / spread - exit_multiple * exit_margin
+            )
+        inputs = {
+            'current_revenue': current_revenue,
+            'growth_rates': growth_rates,
+            'ebit_margin': ebit_margin,
+            'tax_rate': tax_rate,
+            'wacc': wacc,
+            'terminal_growth': terminal_growth,
+            'fcf_conversion': fcf_conversion,
+            'exit_multiple': exit_multiple,
+            'da_margin': da_margin,
+            'blend_weight': blend_weight
+        }
+        elasticity = {
+            name: grad * (inputs[name] / (enterprise_value[:, np.newaxis] if grad.ndim == 2 else enterprise_value))
+            for name, grad in gradient.items()
+        }
+
+    return {'gradient': gradient, 'elasticity': elasticity}
+
+
+def discount_kernel(
+    growth_rates: np.ndarray,
+    wacc: np.ndarray,
+    terminal_growth: np.ndarray,
+    schedule: Optional[Dict] = None
+) -> np.ndarray:
+    """
+    Discounting kernel G of the factorization
+    EV = current_revenue x ebit_margin x (1 - tax_rate) x fcf_conversion x G(growth, wacc, tg)
+    """
+    growth_rates = np.atleast_2d(growth_rates)
+    if growth_rates.dtype not in SUPPORTED_DTYPES:
+        growth_rates = growth_rates.astype(np.float64)
+    if schedule is None:
+        schedule = discount_schedule(growth_rates.shape[1])
+    wacc = np.asarray(wacc, dtype=growth_rates.dtype)
+    terminal_growth = np.asarray(terminal_growth, dtype=growth_rates.dtype)
+    # One growth path may be shared by many WACC / TG cells and vice versa
+    rows = np.broadcast_shapes(growth_rates.shape[:1], wacc.shape, terminal_growth.shape)
+    growth_index = np.cumprod(1 + growth_rates, axis=1)
+    growth_index = np.broadcast_to(growth_index, rows + growth_index.shape[1:])
+    discount_factors = discount_factor_matrix(
+        np.broadcast_to(wacc, rows), growth_index.shape[1], offsets=schedule['offsets']
+    )
+    terminal_factor = terminal_discount_factor(discount_factors, wacc, schedule)
+    terminal = growth_index[:, -1] * (1 + terminal_growth) / (wacc - terminal_growth) * terminal_factor
+    return weight_periods(growth_index * discount_factors, schedule).sum(axis=1) + terminal
+
+
+def discount_schedule(years: int, mid_year: bool = False, stub_fraction: float = 1.0) -> Dict:
+    """
+    Timing of each year's cash flow under a discounting convention
+
+    Period k ends stub_fraction + k - 1 years after the valuation date; its
+    cash flow is discounted from that point, or from the middle of the
+    period under the mid-year convention. Only stub_fraction of year 1's
+    cash flow falls after the valuation date. The terminal value is
+    received at the end of the final period.
+
+    Returns 'times' (years from the valuation date), 'offsets' (times minus
+    the integer year ends 1..years) and 'weights' (share of each year's cash
+    flow counted), all shape (years,), plus the scalar 'terminal_time'.
+    Integer year ends with full weights reproduce the original convention.
+    """
+    if not 0 < stub_fraction <= 1:
+        raise ValueError("stub_fraction must be in (0, 1]")
+    period_ends = stub_fraction + np.arange(years, dtype=np.float64)
+    weights = np.ones(years)
+    weights[0] = stub_fraction
+    times = period_ends - 0.5 * weights if mid_year else period_ends
+    return {
+        'times': times,
+        'offsets': times - np.arange(1, years + 1),
+        'weights': weights,
+        'terminal_time': float(period_ends[-1])
+    }
+
+
+def extend_growth_rates(growth_rates: Sequence[float], forecast_years: Optional[int] = None) -> List[float]:
+    """
+    Growth path over the forecast horizon
+    Years past the given rates hold the last rate flat; without a horizon
+    the rates themselves set it. Every entry point (DCFModel, sensitivity,
+    Monte Carlo, the dashboard) extends paths here so they agree.
+    """
+    growth_rates = list(growth_rates)
+    if forecast_years is None:
+        forecast_years = len(growth_rates)
+    if forecast_years < 1 or not growth_rates:
+        raise ValueError("At least one forecast year and growth rate are required")
+    if len(growth_rates) > forecast_years:
+        raise ValueError(
+            f"{len(growth_rates)} growth rates given for a {forecast_years}-year horizon"
+        )
+    return growth_rates + [growth_rates[-1]] * (forecast_years - len(growth_rates))
+
+
+def weight_periods(values: np.ndarray, schedule: Dict) -> np.ndarray:
+    """Scale year-1 values (last axis) to the stub share; a no-op for full first years"""
+    if schedule['weights'][0] == 1:
+        return values
+    return values * schedule['weights'].astype(values.dtype)
+
+
+def terminal_discount_factor(discount_factors: np.ndarray, wacc: np.ndarray, schedule: Dict) -> np.ndarray:
+    """Discount factor for the terminal value, from the final year's cash-flow factor"""
+    shift = schedule['terminal_time'] - schedule['times'][-1]
+    if shift == 0:
+        return discount_factors[..., -1]
+    return discount_factors[..., -1] / (1 + wacc) ** shift
+
+
+def discount_factor_matrix(
+    wacc: np.ndarray,
+    years: int,
+    dtype: Optional[np.dtype] = None,
+    offsets: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Discount factors 1 / (1 + wacc) ** (year + offset) for years 1..years, shape (len(wacc), years)
+    Built as a cumulative product of the one-year factor, so cost is linear in horizon;
+    a convention's per-year `offsets` (see discount_schedule) only add one power per
+    distinct offset. Float32 WACC stays float32 unless `dtype` says otherwise;
+    anything else is float64
+    """
+    wacc = np.asarray(wacc)
+    if dtype is None:
+        dtype = wacc.dtype if wacc.dtype in SUPPORTED_DTYPES else np.float64
+    one_year = 1 / (1 + wacc.astype(dtype, copy=False))
+    factors = np.cumprod(np.repeat(one_year[:, np.newaxis], years, axis=1), axis=1)
+    if offsets is not None and np.any(offsets):
+        distinct, index = np.unique(offsets, return_inverse=True)
+        factors *= (one_year[:, np.newaxis] ** distinct.astype(factors.dtype))[:, index]
+    return factors
+
+
+def check_dtype(dtype) -> np.dtype:
+    """Validate a precision argument, returning the numpy dtype"""
+    dtype = np.dtype(dtype)
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype {dtype}; use float64 or float32")
+    return dtype
+
+
+def check_terminal_method(terminal_method: str, exit_metric: str = 'ebit'):
+    """Validate terminal value options"""
+    if terminal_method not in TERMINAL_METHODS:
+        raise ValueError(f"Unknown terminal method '{terminal_method}'; choose from {', '.join(TERMINAL_METHODS)}")
+    if exit_metric not in EXIT_METRICS:
+        raise ValueError(f"Unknown exit metric '{exit_metric}'; choose from {', '.join(EXIT_METRICS)}")
+
+
+def check_factorizable(terminal_method: str):
+    """The discounting-kernel factorization needs a perpetuity-growth terminal value"""
+    if terminal_method != 'perpetuity':
+        raise ValueError(
+            f"The discounting kernel factorization only covers the perpetuity method, not '{terminal_method}'"
+        )
+
+
+def perpetuity_weight(terminal_method: str, blend_weight: ArrayLike):
+    """Share of terminal value taken from the perpetuity formula"""
+    if terminal_method == 'perpetuity':
+        return np.ones_like(blend_weight)
+    if terminal_method == 'exit_multiple':
+        return np.zeros_like(blend_weight)
+    return blend_weight
+
+
+def select_terminal_value(
+    terminal_method: str,
+    perpetuity: np.ndarray,
+    exit_value: np.ndarray,
+    blend_weight: ArrayLike = 0.5
+) -> np.ndarray:
+    """Terminal value for a method from the perpetuity and exit-multiple values (broadcasts)"""
+    if terminal_method == 'perpetuity':
+        return perpetuity
+    if terminal_method == 'exit_multiple':
+        return np.broadcast_to(exit_value, np.broadcast_shapes(np.shape(perpetuity), np.shape(exit_value))).copy()
+    return blend_weight * perpetuity + (1 - blend_weight) * exit_value
+
+
+def _or_nan(value) -> float:
+    """None (no exit multiple set) as NaN"""
+    return np.nan if value is None else value
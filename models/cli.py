@@ -0,0 +1,82 @@
+"""
+Batch Valuation CLI
+Value a universe of companies from a CSV, Parquet or Arrow IPC file without the dashboard
+
+Run with: python -m models companies.csv -o valuations.parquet
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from .batch_engine import EXIT_METRICS, TERMINAL_METHODS
+from .pipeline import DEFAULT_CHUNK_SIZE, FORMATS, OPTIONAL_COLUMNS, REQUIRED_COLUMNS, InputError, run_pipeline
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m models",
+        description=(
+            "Value every row of a company file with the batch DCF engine. Rows need "
+            f"{', '.join(REQUIRED_COLUMNS)} and growth_1..growth_N columns; "
+            f"{', '.join(OPTIONAL_COLUMNS)} are optional. Other columns are copied to the output."
+        )
+    )
+    parser.add_argument('input', help="CSV, Parquet or Arrow IPC file of company parameters")
+    parser.add_argument(
+        '-o', '--output', required=True,
+        help="CSV, Parquet or Arrow IPC (.arrow/.feather) file for the results"
+    )
+    parser.add_argument('--input-format', choices=FORMATS, help="Override the format implied by the extension")
+    parser.add_argument('--output-format', choices=FORMATS, help="Override the format implied by the extension")
+    parser.add_argument('--terminal-method', choices=TERMINAL_METHODS, default='perpetuity')
+    parser.add_argument('--exit-metric', choices=EXIT_METRICS, default='ebit')
+    parser.add_argument('--mid-year', action='store_true', help="Discount cash flows from mid-year")
+    parser.add_argument('--stub-fraction', type=float, default=1.0, help="Length of the first period in years")
+    parser.add_argument('--dtype', choices=('float64', 'float32'), default='float64')
+    parser.add_argument(
+        '--series', action='store_true',
+        help="Also store per-year revenue, EBIT, NOPAT, FCF, discount factor and PV columns (Parquet/Arrow only)"
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+        help="Rows read, valued and written at a time; bounds peak memory"
+    )
+    parser.add_argument(
+        '--prefetch', type=int, default=2,
+        help="Chunks queued between the read, value and write threads (0 runs them inline)"
+    )
+    parser.add_argument('--quiet', action='store_true', help="Do not print throughput statistics")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        stats = run_pipeline(
+            args.input,
+            args.output,
+            input_format=args.input_format,
+            output_format=args.output_format,
+            chunk_size=args.chunk_size,
+            prefetch_depth=args.prefetch,
+            series=args.series,
+            terminal_method=args.terminal_method,
+            exit_metric=args.exit_metric,
+            mid_year=args.mid_year,
+            stub_fraction=args.stub_fraction,
+            dtype=args.dtype
+        )
+    except (InputError, ValueError, OSError, ImportError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        rows = stats['rows']
+        seconds = stats['seconds']
+        lines = [f"{rows:,} rows in {stats['chunks']:,} chunks ({stats['invalid']:,} invalid)"]
+        for stage in ('read', 'value', 'write', 'total'):
+            rate = rows / seconds[stage] if seconds[stage] else float('inf')
+            lines.append(f"  {stage:<6} {seconds[stage]:8.3f} s  ({rate:,.0f} rows/s)")
+        print("\n".join(lines), file=sys.stderr)
+    return 0
@@ -0,0 +1,159 @@
+"""
+Columnar Results
+Arrow / Parquet storage for batch valuation outputs, per-year series included
+"""
+
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .dcf_model import ENGINE_VERSION
+from .results import SCALAR_FIELDS, SERIES_FIELDS
+
+
+# Arrow IPC ("Feather v2") can be memory-mapped and read without decoding;
+# Parquet is smaller on disk but every read decompresses
+FORMATS = ('parquet', 'arrow')
+
+Columns = Union[pd.DataFrame, Dict[str, Iterable], None]
+
+
+def series_array(values: np.ndarray) -> pa.FixedSizeListArray:
+    """(N, years) matrix as a fixed-size-list column; C-contiguous input is not copied"""
+    values = np.ascontiguousarray(values)
+    return pa.FixedSizeListArray.from_arrays(pa.array(values.reshape(-1)), values.shape[1])
+
+
+def results_table(
+    results: Dict[str, np.ndarray],
+    columns: Columns = None,
+    series: Iterable[str] = SERIES_FIELDS
+) -> pa.Table:
+    """
+    Batch run_valuation output as an Arrow table
+    `columns` (identifiers and the like) come first, then every scalar
+    output in `results` in its key order, then one fixed-size-list column
+    per name in `series`. Column types follow the result dtype.
+    """
+    if columns is None:
+        table = pa.table({})
+    elif isinstance(columns, pd.DataFrame):
+        table = pa.Table.from_pandas(columns, preserve_index=False).replace_schema_metadata()
+    else:
+        table = pa.table(columns)
+
+    arrays = list(table.columns)
+    names = list(table.column_names)
+    for name, values in results.items():
+        if name in SCALAR_FIELDS:
+            arrays.append(pa.array(np.asarray(values)))
+            names.append(name)
+    for name in series:
+        if name not in SERIES_FIELDS:
+            raise ValueError(f"Unknown series '{name}'; expected one of {', '.join(SERIES_FIELDS)}")
+        arrays.append(series_array(results[name]))
+        names.append(name)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+class ResultsWriter:
+    """
+    Append batches of valuation results to a Parquet or Arrow IPC file
+    Each write becomes one Parquet row group or one Arrow record batch, so
+    results stream to disk during a run and can be read back one group at
+    a time. The schema is fixed by the first write.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        file_format: str = 'parquet',
+        series: Iterable[str] = SERIES_FIELDS,
+        row_group_size: Optional[int] = None
+    ):
+        if file_format not in FORMATS:
+            raise ValueError(f"file_format must be one of {', '.join(FORMATS)}")
+        self.path = path
+        self.file_format = file_format
+        self.series = tuple(series)
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, results: Dict[str, np.ndarray], columns: Columns = None):
+        """Append one batch of run_valuation output with optional leading `columns`"""
+        self.write_table(results_table(results, columns, self.series))
+
+    def write_table(self, table: pa.Table):
+        """Append an already-built results table"""
+        if self._writer is None:
+            years = table.schema.field(self.series[0]).type.list_size if self.series else 0
+            self._schema = table.schema.with_metadata({
+                'engine_version': ENGINE_VERSION,
+                'years': str(years)
+            })
+            if self.file_format == 'parquet':
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, self._schema)
+        # A chunk whose text column is entirely empty infers a null type
+        table = table.cast(self._schema)
+        if self.file_format == 'parquet':
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_table(table, max_chunksize=self.row_group_size)
+        self.rows += table.num_rows
+
+    def close(self):
+        """Finish the file"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_results(
+    path: str,
+    results: Dict[str, np.ndarray],
+    columns: Columns = None,
+    file_format: str = 'parquet',
+    series: Iterable[str] = SERIES_FIELDS,
+    row_group_size: Optional[int] = None
+) -> int:
+    """Write one batch of results in one go; returns the row count"""
+    with ResultsWriter(path, file_format, series, row_group_size) as writer:
+        writer.write(results, columns)
+    return writer.rows
+
+
+def read_results(path: str, file_format: str = 'parquet') -> pa.Table:
+    """
+    Open a results file
+    Arrow IPC files are memory-mapped: columns point into the page cache
+    and nothing is copied until it is touched. Parquet is decoded in full.
+    """
+    if file_format == 'arrow':
+        return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return pq.read_table(path, memory_map=True)
+
+
+def series_matrix(column: Union[pa.ChunkedArray, pa.FixedSizeListArray]) -> np.ndarray:
+    """
+    (N, years) numpy matrix from a fixed-size-list column
+    A single-chunk column without nulls comes back as a zero-copy view,
+    e.g. straight onto a memory-mapped file.
+    """
+    if isinstance(column, pa.ChunkedArray):
+        column = column.chunks[0] if column.num_chunks == 1 else column.combine_chunks()
+    years = column.type.list_size
+    values = column.flatten() if column.offset else column.values
+    return values.to_numpy(zero_copy_only=False).reshape(-1, years)
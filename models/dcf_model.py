@@ -4,11 +4,99 @@ Handles all financial calculations for the valuation dashboard
 """
 
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+
+from .batch_engine import (
+    check_dtype,
+    check_factorizable,
+    check_terminal_method,
+    discount_factor_matrix,
+    discount_kernel,
+    discount_schedule,
+    ev_gradients,
+    extend_growth_rates,
+    perpetuity_weight,
+    select_terminal_value,
+    terminal_discount_factor,
+    weight_periods
+)
+from .results import ValuationResult
+
+
+# Bump whenever a change alters valuation outputs; cached results from
+# other versions are invalidated
+ENGINE_VERSION = "3"
+
+# Valuation stages in incremental mode: the model inputs each stage reads
+# directly, and the upstream stages whose outputs it consumes
+STAGE_DEPENDENCIES = {
+    'revenues': (('current_revenue', 'growth_rates'), ()),
+    'ebits': (('ebit_margin',), ('revenues',)),
+    'nopats': (('tax_rate',), ('ebits',)),
+    'fcfs': (('fcf_conversion',), ('nopats',)),
+    'discount_factors': (('wacc', 'forecast_years', 'mid_year', 'stub_fraction'), ()),
+    'pv_fcfs': (('stub_fraction',), ('fcfs', 'discount_factors')),
+    'terminal_value': (
+        ('wacc', 'terminal_growth', 'terminal_method', 'exit_multiple', 'exit_metric', 'da_margin', 'blend_weight'),
+        ('revenues', 'ebits', 'fcfs')
+    ),
+    'pv_terminal_value': (('mid_year',), ('terminal_value', 'discount_factors')),
+    'pv_forecast_period': ((), ('pv_fcfs',)),
+    'enterprise_value': ((), ('pv_forecast_period', 'pv_terminal_value'))
+}
+
+MODEL_INPUTS = (
+    'current_revenue',
+    'growth_rates',
+    'ebit_margin',
+    'tax_rate',
+    'wacc',
+    'terminal_growth',
+    'fcf_conversion',
+    'forecast_years',
+    'exit_multiple',
+    'terminal_method',
+    'exit_metric',
+    'da_margin',
+    'blend_weight',
+    'mid_year',
+    'stub_fraction'
+)
+
+# Values DCFModel gives the optional inputs; code reading parameter
+# dictionaries goes through model_input so defaults cannot drift apart
+MODEL_DEFAULTS = {
+    'fcf_conversion': 0.8,
+    'forecast_years': None,
+    'exit_multiple': None,
+    'terminal_method': 'perpetuity',
+    'exit_metric': 'ebit',
+    'da_margin': 0.0,
+    'blend_weight': 0.5,
+    'mid_year': False,
+    'stub_fraction': 1.0
+}
+
+
+def model_input(params: Dict, name: str):
+    """An input from DCFModel keyword arguments, with DCFModel's default (NaN for a missing required input)"""
+    return params.get(name, MODEL_DEFAULTS.get(name, np.nan))
 
 
 class DCFModel:
-    """Discounted Cash Flow valuation model"""
+    """
+    Discounted Cash Flow valuation model
+    
+    Terminal value uses `terminal_method`: 'perpetuity' (Gordon growth),
+    'exit_multiple' (`exit_multiple` x final-year EBIT, or EBITDA when
+    `exit_metric` is 'ebitda', with D&A at `da_margin` of revenue) or
+    'blended' (`blend_weight` on perpetuity, the rest on the multiple). Both
+    values are reported by run_valuation whenever an exit multiple is set.
+    
+    `mid_year` discounts cash flows from the middle of each year, and a
+    `stub_fraction` below 1 makes the first period a partial year from the
+    valuation date (see discount_schedule).
+    """
     
     def __init__(
         self,
@@ -18,22 +106,134 @@ class DCFModel:
         tax_rate: float,
         wacc: float,
         terminal_growth: float,
-        fcf_conversion: float = 0.8
+        fcf_conversion: float = MODEL_DEFAULTS['fcf_conversion'],
+        forecast_years: Optional[int] = MODEL_DEFAULTS['forecast_years'],
+        exit_multiple: Optional[float] = MODEL_DEFAULTS['exit_multiple'],
+        terminal_method: str = MODEL_DEFAULTS['terminal_method'],
+        exit_metric: str = MODEL_DEFAULTS['exit_metric'],
+        da_margin: float = MODEL_DEFAULTS['da_margin'],
+        blend_weight: float = MODEL_DEFAULTS['blend_weight'],
+        mid_year: bool = MODEL_DEFAULTS['mid_year'],
+        stub_fraction: float = MODEL_DEFAULTS['stub_fraction'],
+        incremental: bool = False
     ):
+        self._check_terminal_options(terminal_method, exit_metric, exit_multiple)
+        self._check_stub_fraction(stub_fraction)
         self.current_revenue = current_revenue
-        self.growth_rates = growth_rates
+        self.growth_rates, self.forecast_years = self._extend_growth_rates(growth_rates, forecast_years)
+        # The rates as given, kept apart from the extended path so that
+        # shortening and then lengthening the horizon restores them
+        self._explicit_growth_rates = list(growth_rates)
         self.ebit_margin = ebit_margin
         self.tax_rate = tax_rate
         self.wacc = wacc
         self.terminal_growth = terminal_growth
         self.fcf_conversion = fcf_conversion
+        self.exit_multiple = exit_multiple
+        self.terminal_method = terminal_method
+        self.exit_metric = exit_metric
+        self.da_margin = da_margin
+        self.blend_weight = blend_weight
+        self.mid_year = mid_year
+        self.stub_fraction = stub_fraction
+        
+        # Incremental mode keeps each stage's output keyed on its inputs
+        self.incremental = incremental
+        self._stage_cache = {}
+        self.stage_counters = {'reused': 0, 'recomputed': 0}
+    
+    @staticmethod
+    def _extend_growth_rates(growth_rates: List[float], forecast_years: Optional[int]) -> Tuple[List[float], int]:
+        """Validate growth rates against the horizon, holding the last rate flat for any remaining years"""
+        growth_rates = extend_growth_rates(growth_rates, forecast_years)
+        return growth_rates, len(growth_rates)
+    
+    @staticmethod
+    def _check_terminal_options(terminal_method: str, exit_metric: str, exit_multiple: Optional[float]):
+        """Validate the terminal value method and that it has a multiple if it needs one"""
+        check_terminal_method(terminal_method, exit_metric)
+        if terminal_method != 'perpetuity' and exit_multiple is None:
+            raise ValueError(f"terminal_method '{terminal_method}' needs an exit_multiple")
+    
+    @staticmethod
+    def _check_stub_fraction(stub_fraction: float):
+        """The first period must be a positive part of a year"""
+        if not 0 < stub_fraction <= 1:
+            raise ValueError("stub_fraction must be in (0, 1]")
+    
+    def update(self, **params):
+        """
+        Change model inputs in place
+        In incremental mode only stages downstream of the changed inputs are
+        recomputed on the next run_valuation. New growth_rates keep the
+        current forecast_years unless it is passed too; more rates than the
+        horizon covers lengthen it, and forecast_years=None sets it to the
+        number of rates. An explicit horizon shorter than the rates raises.
+        """
+        unknown = set(params) - set(MODEL_INPUTS)
+        if unknown:
+            raise TypeError(f"Unknown model inputs: {', '.join(sorted(unknown))}")
+        self._check_terminal_options(
+            *(params.get(name, getattr(self, name)) for name in ('terminal_method', 'exit_metric', 'exit_multiple'))
+        )
+        self._check_stub_fraction(params.get('stub_fraction', self.stub_fraction))
+        
+        if 'growth_rates' in params or 'forecast_years' in params:
+            # An omitted horizon keeps the current one, lengthened if more
+            # rates are given; an explicit None re-derives it from the rates
+            keep_horizon = 'forecast_years' not in params
+            forecast_years = params.pop('forecast_years', self.forecast_years)
+            explicit = self._explicit_growth_rates
+            if 'growth_rates' in params:
+                explicit = growth_rates = list(params.pop('growth_rates'))
+                if keep_horizon:
+                    forecast_years = max(forecast_years, len(growth_rates))
+            else:
+                # Re-horizon from the explicit rates, not the extended path
+                growth_rates = explicit[:forecast_years]
+            self.growth_rates, self.forecast_years = self._extend_growth_rates(growth_rates, forecast_years)
+            self._explicit_growth_rates = explicit
+        
+        for name, value in params.items():
+            setattr(self, name, value)
+    
+    def _params(self) -> Dict:
+        """Current inputs as DCFModel keyword arguments"""
+        return {name: getattr(self, name) for name in MODEL_INPUTS}
+    
+    def reset_stage_counters(self):
+        """Zero the reused/recomputed stage counters"""
+        self.stage_counters = {'reused': 0, 'recomputed': 0}
+    
+    def _stage(self, name: str, compute):
+        """
+        Return a stage's output, recomputing it only if its inputs changed
+        A stage's key holds its direct model inputs and the version of each
+        upstream stage, so a change propagates exactly to downstream stages
+        """
+        if not self.incremental:
+            return compute()
         
+        params, upstream = STAGE_DEPENDENCIES[name]
+        key = (
+            tuple(_freeze(getattr(self, param)) for param in params),
+            tuple(self._stage_cache[stage][1] for stage in upstream)
+        )
+        cached = self._stage_cache.get(name)
+        if cached is not None and cached[0] == key:
+            self.stage_counters['reused'] += 1
+            return cached[2]
+        
+        self.stage_counters['recomputed'] += 1
+        version = cached[1] + 1 if cached is not None else 0
+        value = compute()
+        self._stage_cache[name] = (key, version, value)
+        return value
+    
     def project_revenue(self) -> List[float]:
-        """Project 5-year revenue based on growth rates"""
-        revenues = [self.current_revenue]
-        for growth in self.growth_rates:
-            revenues.append(revenues[-1] * (1 + growth))
-        return revenues[1:]  # Return only projected years (1-5)
+        """Project revenue over the forecast horizon based on growth rates"""
+        growth_factors = np.concatenate(([self.current_revenue], 1 + np.asarray(self.growth_rates)))
+        return np.cumprod(growth_factors)[1:].tolist()  # Return only projected years
     
     def calculate_ebit(self, revenues: List[float]) -> List[float]:
         """Calculate EBIT for each year"""
@@ -47,102 +247,289 @@ class DCFModel:
         """Calculate Free Cash Flow"""
         return [nopat * self.fcf_conversion for nopat in nopats]
     
+    def discount_schedule(self) -> Dict:
+        """Discounting times, offsets and weights for the model's convention"""
+        return discount_schedule(self.forecast_years, self.mid_year, self.stub_fraction)
+    
     def calculate_discount_factors(self) -> List[float]:
         """Calculate discount factors for each year"""
-        return [(1 / (1 + self.wacc) ** year) for year in range(1, 6)]
+        offsets = self.discount_schedule()['offsets']
+        return discount_factor_matrix(np.array([self.wacc]), self.forecast_years, offsets=offsets)[0].tolist()
     
     def calculate_pv_fcf(self, fcfs: List[float], discount_factors: List[float]) -> List[float]:
-        """Calculate present value of each year's FCF"""
-        return [fcf * df for fcf, df in zip(fcfs, discount_factors)]
+        """Calculate present value of each year's FCF (only the stub share of year 1)"""
+        pv_fcfs = [fcf * df for fcf, df in zip(fcfs, discount_factors)]
+        pv_fcfs[0] *= self.stub_fraction
+        return pv_fcfs
+    
+    def calculate_terminal_discount_factor(self, discount_factors: List[float]) -> float:
+        """Discount factor at the end of the final period"""
+        return float(terminal_discount_factor(np.asarray(discount_factors), self.wacc, self.discount_schedule()))
     
-    def calculate_terminal_value(self, final_fcf: float) -> float:
-        """Calculate terminal value using perpetuity growth method"""
-        return final_fcf * (1 + self.terminal_growth) / (self.wacc - self.terminal_growth)
+    def calculate_exit_metric(self, revenues: List[float], ebits: List[float]) -> float:
+        """Final-year EBIT or EBITDA the exit multiple applies to"""
+        if self.exit_metric == 'ebitda':
+            return ebits[-1] + revenues[-1] * self.da_margin
+        return ebits[-1]
+    
+    def calculate_terminal_values(self, final_fcf: float, final_metric: float) -> Dict[str, float]:
+        """Perpetuity, exit-multiple and selected terminal values (exit is NaN without a multiple)"""
+        perpetuity = final_fcf * (1 + self.terminal_growth) / (self.wacc - self.terminal_growth)
+        exit_value = final_metric * self.exit_multiple if self.exit_multiple is not None else float('nan')
+        return {
+            'perpetuity': perpetuity,
+            'exit_multiple': exit_value,
+            'selected': float(select_terminal_value(self.terminal_method, perpetuity, exit_value, self.blend_weight))
+        }
+    
+    def calculate_terminal_value(self, final_fcf: float, final_metric: Optional[float] = None) -> float:
+        """Calculate terminal value using the model's terminal method"""
+        if final_metric is None:
+            final_metric = float('nan')
+        return self.calculate_terminal_values(final_fcf, final_metric)['selected']
+    
+    def _project_financials(self) -> Tuple[List[float], List[float], List[float], List[float]]:
+        """Revenues, EBIT, NOPAT and FCF, reused across runs in incremental mode"""
+        revenues = self._stage('revenues', self.project_revenue)
+        ebits = self._stage('ebits', lambda: self.calculate_ebit(revenues))
+        nopats = self._stage('nopats', lambda: self.calculate_nopat(ebits))
+        fcfs = self._stage('fcfs', lambda: self.calculate_fcf(nopats))
+        return revenues, ebits, nopats, fcfs
     
     def calculate_pv_terminal_value(self, terminal_value: float, final_discount_factor: float) -> float:
         """Calculate present value of terminal value"""
         return terminal_value * final_discount_factor
     
-    def run_valuation(self) -> Dict:
-        """Run complete DCF valuation and return all results"""
+    def run_valuation(self) -> ValuationResult:
+        """
+        Run complete DCF valuation and return all results
+        The ValuationResult reads like the former dict (results['fcfs'], ...);
+        call to_dict() for plain lists
+        """
         # Project financials
-        revenues = self.project_revenue()
-        ebits = self.calculate_ebit(revenues)
-        nopats = self.calculate_nopat(ebits)
-        fcfs = self.calculate_fcf(nopats)
+        revenues, ebits, nopats, fcfs = self._project_financials()
         
         # Calculate present values
-        discount_factors = self.calculate_discount_factors()
-        pv_fcfs = self.calculate_pv_fcf(fcfs, discount_factors)
+        discount_factors = self._stage('discount_factors', self.calculate_discount_factors)
+        pv_fcfs = self._stage('pv_fcfs', lambda: self.calculate_pv_fcf(fcfs, discount_factors))
         
-        # Terminal value
-        terminal_value = self.calculate_terminal_value(fcfs[-1])
-        pv_terminal_value = self.calculate_pv_terminal_value(terminal_value, discount_factors[-1])
+        # Terminal value, by every method at once
+        terminal_values = self._stage(
+            'terminal_value',
+            lambda: self.calculate_terminal_values(fcfs[-1], self.calculate_exit_metric(revenues, ebits))
+        )
+        terminal_value = terminal_values['selected']
+        pv_terminal_value = self._stage(
+            'pv_terminal_value',
+            lambda: self.calculate_pv_terminal_value(
+                terminal_value, self.calculate_terminal_discount_factor(discount_factors)
+            )
+        )
         
         # Enterprise value
-        pv_forecast_period = sum(pv_fcfs)
-        enterprise_value = pv_forecast_period + pv_terminal_value
+        pv_forecast_period = self._stage('pv_forecast_period', lambda: sum(pv_fcfs))
+        enterprise_value = self._stage('enterprise_value', lambda: pv_forecast_period + pv_terminal_value)
         
-        return {
-            'revenues': revenues,
-            'ebits': ebits,
-            'nopats': nopats,
-            'fcfs': fcfs,
-            'discount_factors': discount_factors,
-            'pv_fcfs': pv_fcfs,
-            'terminal_value': terminal_value,
-            'pv_terminal_value': pv_terminal_value,
-            'pv_forecast_period': pv_forecast_period,
-            'enterprise_value': enterprise_value
-        }
+        return ValuationResult.from_series(
+            {
+                'revenues': revenues,
+                'ebits': ebits,
+                'nopats': nopats,
+                'fcfs': fcfs,
+                'discount_factors': discount_factors,
+                'pv_fcfs': pv_fcfs
+            },
+            terminal_value=terminal_value,
+            pv_terminal_value=pv_terminal_value,
+            pv_forecast_period=pv_forecast_period,
+            enterprise_value=enterprise_value,
+            current_revenue=self.current_revenue,
+            terminal_value_perpetuity=terminal_values['perpetuity'],
+            terminal_value_exit_multiple=terminal_values['exit_multiple']
+        )
     
     def sensitivity_analysis(
         self,
         wacc_range: np.ndarray,
-        tg_range: np.ndarray
+        tg_range: np.ndarray,
+        exit_multiple_range: Optional[np.ndarray] = None,
+        terminal_method: Optional[str] = None,
+        dtype: np.dtype = np.float64
     ) -> np.ndarray:
         """
         Run sensitivity analysis across WACC and terminal growth combinations
-        Returns matrix of enterprise values
+        Returns matrix of enterprise values, shape (len(tg_range), len(wacc_range))
+        
+        Axes may be any 1-D sequences, uniform or not. Discount factors are
+        built once per WACC and the terminal value is broadcast over TG.
+        With `exit_multiple_range` the exit multiple becomes a leading axis,
+        shape (len(exit_multiple_range), len(tg_range), len(wacc_range)).
+        `terminal_method` overrides the model's method, so perpetuity,
+        exit-multiple and blended grids can be compared from the same inputs.
+        Pass dtype=np.float32 for very large grids (see BatchDCFEngine for
+        the error bound).
         """
+        dtype = check_dtype(dtype)
+        terminal_method = terminal_method or self.terminal_method
+        check_terminal_method(terminal_method, self.exit_metric)
+        wacc_range = np.asarray(wacc_range, dtype=dtype).ravel()
+        tg_range = np.asarray(tg_range, dtype=dtype).ravel()
+        if exit_multiple_range is not None:
+            exit_multiples = np.asarray(exit_multiple_range, dtype=dtype).ravel()[:, np.newaxis, np.newaxis]
+        elif terminal_method != 'perpetuity' and self.exit_multiple is None:
+            raise ValueError(f"terminal_method '{terminal_method}' needs an exit_multiple or exit_multiple_range")
+        else:
+            exit_multiples = dtype.type(np.nan if self.exit_multiple is None else self.exit_multiple)
+        
         # Pre-calculate FCFs (they don't change with WACC/TG)
-        revenues = self.project_revenue()
-        ebits = self.calculate_ebit(revenues)
-        nopats = self.calculate_nopat(ebits)
-        fcfs = self.calculate_fcf(nopats)
-        
-        sensitivity_matrix = np.zeros((len(tg_range), len(wacc_range)))
-        
-        for i, tg in enumerate(tg_range):
-            for j, w in enumerate(wacc_range):
-                # Recalculate with different WACC and terminal growth
-                temp_discount_factors = [(1 / (1 + w) ** year) for year in range(1, 6)]
-                temp_pv_fcfs = [fcf * df for fcf, df in zip(fcfs, temp_discount_factors)]
-                temp_terminal_value = fcfs[-1] * (1 + tg) / (w - tg)
-                temp_pv_terminal = temp_terminal_value * temp_discount_factors[-1]
-                sensitivity_matrix[i, j] = sum(temp_pv_fcfs) + temp_pv_terminal
-        
-        return sensitivity_matrix
-    
-    def calculate_wacc_sensitivity(self) -> Tuple[float, float]:
-        """Calculate sensitivity to ±1% change in WACC"""
-        results = self.run_valuation()
-        base_ev = results['enterprise_value']
+        revenues, ebits, _, fcfs = self._project_financials()
+        final_metric = dtype.type(self.calculate_exit_metric(revenues, ebits))
+        fcfs = np.asarray(fcfs, dtype=dtype)
+        schedule = self.discount_schedule()
+        
+        # One row of discount factors per WACC, shape (len(wacc_range), years)
+        discount_factors = discount_factor_matrix(wacc_range, len(fcfs), offsets=schedule['offsets'])
+        pv_forecast_period = weight_periods(discount_factors * fcfs, schedule).sum(axis=1)
+        
+        # Terminal value for every (TG, WACC) pair, and every exit multiple
+        perpetuity = fcfs[-1] * (1 + tg_range[:, np.newaxis]) / (wacc_range - tg_range[:, np.newaxis])
+        terminal_values = select_terminal_value(
+            terminal_method, perpetuity, final_metric * exit_multiples, dtype.type(self.blend_weight)
+        )
+        pv_terminal_values = terminal_values * terminal_discount_factor(discount_factors, wacc_range, schedule)
+        
+        shape = (len(tg_range), len(wacc_range))
+        if exit_multiple_range is not None:
+            shape = (exit_multiples.shape[0],) + shape
+        return np.broadcast_to(pv_forecast_period + pv_terminal_values, shape).copy()
+    
+    def discount_kernel(self) -> float:
+        """
+        EV per unit of current_revenue x ebit_margin x (1 - tax_rate) x fcf_conversion
+        Depends only on the growth path, WACC and terminal growth (perpetuity
+        method only)
+        """
+        check_factorizable(self.terminal_method)
+        return float(discount_kernel(
+            np.array([self.growth_rates], dtype=np.float64),
+            self.wacc,
+            self.terminal_growth,
+            self.discount_schedule()
+        )[0])
+    
+    def factorized_sweep(self, dtype: np.dtype = np.float64, **linear_inputs) -> np.ndarray:
+        """
+        EV over every combination of the given current_revenue, ebit_margin,
+        tax_rate and fcf_conversion values, from one kernel evaluation
+        """
+        from .sensitivity import factorized_sweep
+        
+        return factorized_sweep(self._params(), dtype=dtype, **linear_inputs)
+    
+    def run_monte_carlo(
+        self,
+        distributions: Dict,
+        n_draws: int,
+        seed: int = None,
+        workers: int = 1,
+        **kwargs
+    ) -> Dict:
+        """
+        Monte Carlo valuation around this model
+        Inputs without an entry in `distributions` stay at the model's values;
+        `workers` > 1 runs draws on a process pool, and extra keyword
+        arguments are passed to MonteCarloEngine
+        """
+        from .monte_carlo import MonteCarloEngine
         
-        # Calculate EV at WACC +1%
-        model_plus = DCFModel(
-            self.current_revenue, self.growth_rates, self.ebit_margin,
-            self.tax_rate, self.wacc + 0.01, self.terminal_growth, self.fcf_conversion
+        engine = MonteCarloEngine.from_model_params(self._params(), distributions, **kwargs)
+        return engine.run(n_draws, seed=seed, workers=workers)
+    
+    def calculate_gradients(self, results: Optional[Dict] = None) -> Dict[str, Dict]:
+        """
+        Exact partial derivatives and elasticities of EV for every input
+        Single pass over the valuation results (pass run_valuation output to
+        reuse it). Returns {'gradient': ..., 'elasticity': ...} keyed by input
+        name; growth_rates entries are lists with one value per year.
+        """
+        if results is None:
+            results = self.run_valuation()
+        
+        exit_margin = self.ebit_margin + (self.da_margin if self.exit_metric == 'ebitda' else 0.0)
+        
+        batch = ev_gradients(
+            {name: np.asarray(results[name], dtype=np.float64)
+             for name in ('discount_factors', 'pv_fcfs', 'pv_terminal_value', 'enterprise_value')},
+            current_revenue=np.array([self.current_revenue], dtype=np.float64),
+            growth_rates=np.array([self.growth_rates], dtype=np.float64),
+            ebit_margin=np.array([self.ebit_margin], dtype=np.float64),
+            tax_rate=np.array([self.tax_rate], dtype=np.float64),
+            wacc=np.array([self.wacc], dtype=np.float64),
+            terminal_growth=np.array([self.terminal_growth], dtype=np.float64),
+            fcf_conversion=np.array([self.fcf_conversion], dtype=np.float64),
+            perpetuity_share=perpetuity_weight(self.terminal_method, self.blend_weight),
+            exit_multiple=(
+                np.array([self.exit_multiple], dtype=np.float64) if self.terminal_method != 'perpetuity' else None
+            ),
+            exit_margin=np.array([exit_margin], dtype=np.float64),
+            da_margin=(
+                np.array([self.da_margin], dtype=np.float64)
+                if self.terminal_method != 'perpetuity' and self.exit_metric == 'ebitda' else None
+            ),
+            blend_weight=(
+                np.array([self.blend_weight], dtype=np.float64) if self.terminal_method == 'blended' else None
+            ),
+            schedule=self.discount_schedule()
         )
-        ev_plus = model_plus.run_valuation()['enterprise_value']
+        return {
+            kind: {
+                name: values[0].tolist() if name == 'growth_rates' else float(values[0])
+                for name, values in by_input.items()
+            }
+            for kind, by_input in batch.items()
+        }
+    
+    def solve_for(self, parameter: str, target_ev, **kwargs):
+        """
+        Value of `parameter` that makes enterprise value equal `target_ev`
+        Accepts one target or an array of targets (returning an array); NaN
+        marks targets with no solution. Keyword arguments go to solve_for_ev.
+        """
+        from .solver import solve_for_ev
         
-        # Calculate EV at WACC -1%
-        model_minus = DCFModel(
-            self.current_revenue, self.growth_rates, self.ebit_margin,
-            self.tax_rate, self.wacc - 0.01, self.terminal_growth, self.fcf_conversion
+        solution = solve_for_ev(self._params(), parameter, target_ev, **kwargs)
+        values = np.where(solution['converged'], solution['value'], np.nan)
+        return float(values[0]) if np.ndim(target_ev) == 0 else values
+    
+    def calculate_implied_irr(self, price: float, results: Optional[Dict] = None) -> float:
+        """
+        IRR from paying `price` for the projected FCFs plus the terminal value
+        NaN if the cash flows cannot recover the price at any rate
+        """
+        from .irr import implied_irr
+        
+        if results is None:
+            results = self.run_valuation()
+        solution = implied_irr(
+            [results['fcfs']], [price], [results['terminal_value']], schedule=self.discount_schedule()
         )
-        ev_minus = model_minus.run_valuation()['enterprise_value']
+        return float(solution['irr'][0])
+    
+    def calculate_wacc_sensitivity(self, results: Optional[Dict] = None) -> Tuple[float, float]:
+        """
+        Calculate sensitivity to ±1% change in WACC
+        First-order estimate from the analytic WACC derivative, so no extra
+        valuations are run when `results` is supplied
+        """
+        if results is None:
+            results = self.run_valuation()
+        base_ev = results['enterprise_value']
         
         # Return percentage change
-        sensitivity = (ev_minus - ev_plus) / (2 * base_ev)
+        sensitivity = -self.calculate_gradients(results)['gradient']['wacc'] * 0.01 / base_ev
         return sensitivity, base_ev
+
+
+def _freeze(value):
+    """Hashable, comparable form of a model input"""
+    return tuple(value) if isinstance(value, (list, tuple, np.ndarray)) else value
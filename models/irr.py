@@ -0,0 +1,121 @@
+"""
+Implied IRR
+Vectorized internal rate of return for purchase prices across a deal pipeline
+"""
+
+import numpy as np
+from typing import Dict, Optional
+
+from .batch_engine import BatchDCFEngine, discount_factor_matrix, discount_schedule, terminal_discount_factor
+
+
+def implied_irr(
+    cash_flows: np.ndarray,
+    prices: np.ndarray,
+    terminal_values: Optional[np.ndarray] = None,
+    tol: float = 1e-10,
+    max_iter: int = 100,
+    schedule: Optional[Dict] = None
+) -> Dict:
+    """
+    IRR that equates each row's discounted cash flows with its price
+
+    Solves -price + sum_t CF_t / (1 + r) ** t + TV / (1 + r) ** T = 0 for an
+    (N, years) cash-flow matrix, (N,) prices and optional (N,) terminal
+    values received at the end of the final year. A `schedule` from
+    discount_schedule replaces the integer years t with its mid-year or
+    stub-period times. All rows are iterated together with Newton steps,
+    each kept inside a per-row sign-change bracket and replaced by
+    bisection when it would leave it.
+
+    Returns the IRRs (NaN where no root was bracketed), a converged mask, the
+    NPV residuals and a convergence report.
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    n_rows, years = cash_flows.shape
+    prices = np.broadcast_to(np.asarray(prices, dtype=np.float64), (n_rows,))
+    if schedule is None:
+        schedule = discount_schedule(years)
+    cash_flows = cash_flows * schedule['weights']
+    terminal = np.zeros(n_rows)
+    if terminal_values is not None:
+        terminal = np.broadcast_to(np.asarray(terminal_values, dtype=np.float64), (n_rows,))
+
+    def npv_and_slope(rates: np.ndarray, rows: np.ndarray):
+        factors = discount_factor_matrix(rates, years, offsets=schedule['offsets'])
+        flows = cash_flows[rows] * factors
+        terminal_pv = terminal[rows] * terminal_discount_factor(factors, rates, schedule)
+        npv = flows.sum(axis=1) + terminal_pv - prices[rows]
+        slope = -(flows @ schedule['times'] + terminal_pv * schedule['terminal_time']) / (1 + rates)
+        return npv, slope
+
+    # Bracket: NPV of conventional deals falls as the rate rises, so widen
+    # the upper bound until NPV turns negative
+    all_rows = np.arange(n_rows)
+    low = np.full(n_rows, -0.99)
+    high = np.full(n_rows, 1.0)
+    npv_low = npv_and_slope(low, all_rows)[0]
+    npv_high = npv_and_slope(high, all_rows)[0]
+    for _ in range(10):
+        widen = np.sign(npv_high) == np.sign(npv_low)
+        if not widen.any():
+            break
+        high[widen] *= 4
+        npv_high[widen] = npv_and_slope(high[widen], all_rows[widen])[0]
+    bracketed = np.sign(npv_high) != np.sign(npv_low)
+    decreasing = npv_low > 0
+
+    # Seed with the rate that makes an even annuity of the mean flow worth the price
+    with np.errstate(divide='ignore', invalid='ignore'):
+        seed = (cash_flows.sum(axis=1) + terminal) / prices / years - 1 / years
+    rates = np.where(np.isfinite(seed) & (seed > low) & (seed < high), seed, 0.1)
+    rates = np.clip(rates, low, high)
+
+    active = bracketed.copy()
+    residual = np.full(n_rows, np.nan)
+    iterations = 0
+    while active.any() and iterations < max_iter:
+        iterations += 1
+        idx = np.flatnonzero(active)
+        npv, slope = npv_and_slope(rates[idx], idx)
+        residual[idx] = npv
+
+        done = np.abs(npv) <= tol * np.maximum(np.abs(prices[idx]), 1.0)
+        # Move the bracket end that shares the sign of the current NPV
+        above = (npv > 0) == decreasing[idx]
+        low[idx] = np.where(above, rates[idx], low[idx])
+        high[idx] = np.where(above, high[idx], rates[idx])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = rates[idx] - npv / slope
+        inside = np.isfinite(step) & (step > low[idx]) & (step < high[idx])
+        next_rates = np.where(inside, step, 0.5 * (low[idx] + high[idx]))
+        done |= (high[idx] - low[idx]) <= tol
+
+        rates[idx] = np.where(done, rates[idx], next_rates)
+        active[idx[done]] = False
+
+    converged = bracketed & ~active
+    irr = np.where(converged, rates, np.nan)
+    return {
+        'irr': irr,
+        'converged': converged,
+        'residual': np.where(bracketed, residual, np.nan),
+        'report': {
+            'rows': n_rows,
+            'converged': int(converged.sum()),
+            'not_bracketed': int((~bracketed).sum()),
+            'iterations': iterations,
+            'max_abs_residual': float(np.nanmax(np.abs(residual))) if converged.any() else float('nan')
+        }
+    }
+
+
+def implied_irr_for_batch(engine: BatchDCFEngine, prices: np.ndarray, **kwargs) -> Dict:
+    """
+    IRR of paying `prices` for each scenario's projected FCFs plus its
+    terminal value (by the engine's terminal method) at the end of the
+    forecast period
+    """
+    results = engine.run_valuation()
+    return implied_irr(results['fcfs'], prices, results['terminal_value'], schedule=engine.schedule, **kwargs)
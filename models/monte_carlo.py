@@ -0,0 +1,410 @@
+"""
+Monte Carlo Valuation
+Chunked, memory-bounded simulation of enterprise value under input uncertainty
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .batch_engine import BatchDCFEngine, check_dtype, check_terminal_method, extend_growth_rates
+from .dcf_model import model_input
+
+
+SCALAR_INPUTS = (
+    'current_revenue',
+    'ebit_margin',
+    'tax_rate',
+    'wacc',
+    'terminal_growth',
+    'fcf_conversion'
+)
+
+# Terminal value inputs that may be given distributions; defaults otherwise
+OPTIONAL_INPUTS = {
+    'exit_multiple': np.nan,
+    'da_margin': 0.0,
+    'blend_weight': 0.5
+}
+
+DEFAULT_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+
+class Distribution:
+    """Sampling distribution for a single model input"""
+
+    def __init__(self, kind: str, **params: float):
+        if kind not in ('fixed', 'normal', 'uniform', 'triangular', 'lognormal'):
+            raise ValueError(f"Unknown distribution kind: {kind}")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def fixed(cls, value: float) -> "Distribution":
+        """Constant value"""
+        return cls('fixed', value=value)
+
+    @classmethod
+    def normal(
+        cls,
+        mean: float,
+        std: float,
+        low: float = -np.inf,
+        high: float = np.inf
+    ) -> "Distribution":
+        """Normal distribution, optionally clipped to [low, high]"""
+        return cls('normal', mean=mean, std=std, low=low, high=high)
+
+    @classmethod
+    def uniform(cls, low: float, high: float) -> "Distribution":
+        """Uniform distribution on [low, high)"""
+        return cls('uniform', low=low, high=high)
+
+    @classmethod
+    def triangular(cls, low: float, mode: float, high: float) -> "Distribution":
+        """Triangular distribution with the given mode"""
+        return cls('triangular', low=low, mode=mode, high=high)
+
+    @classmethod
+    def lognormal(cls, mean: float, sigma: float) -> "Distribution":
+        """Log-normal distribution parameterised by the underlying normal"""
+        return cls('lognormal', mean=mean, sigma=sigma)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Draw `size` samples"""
+        p = self.params
+        if self.kind == 'fixed':
+            return np.full(size, p['value'], dtype=np.float64)
+        if self.kind == 'normal':
+            draws = rng.normal(p['mean'], p['std'], size)
+            return np.clip(draws, p['low'], p['high'], out=draws)
+        if self.kind == 'uniform':
+            return rng.uniform(p['low'], p['high'], size)
+        if self.kind == 'triangular':
+            return rng.triangular(p['low'], p['mode'], p['high'], size)
+        return rng.lognormal(p['mean'], p['sigma'], size)
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{k}={v!r}" for k, v in self.params.items())
+        return f"Distribution.{self.kind}({args})"
+
+
+InputSpec = Union[float, Distribution]
+
+
+class StreamingStats:
+    """
+    Running summary of a stream of values
+    Tracks count, mean, variance (Welford/Chan), min, max and a fixed-bin
+    histogram, so memory stays constant however many values are added
+    """
+
+    def __init__(self, edges: np.ndarray):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.n_invalid = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray):
+        """
+        Add a batch of values; non-finite values are counted as invalid
+        Values are widened to float64 first, so sums never accumulate in float32
+        """
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        if not finite.all():
+            self.n_invalid += int((~finite).sum())
+            values = values[finite]
+        if values.size == 0:
+            return
+
+        batch = StreamingStats(self.edges)
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        batch.counts = np.histogram(values, bins=self.edges)[0]
+        batch.underflow = int((values < self.edges[0]).sum())
+        batch.overflow = int((values > self.edges[-1]).sum())
+        self.merge(batch)
+
+    def merge(self, other: "StreamingStats"):
+        """Fold another summary over the same bin edges into this one"""
+        self.n_invalid += other.n_invalid
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation"""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Percentile interpolated within histogram bins
+        Accuracy is limited by the bin width; ranks falling in the
+        under/overflow tails are reported as the observed min/max
+        """
+        if self.count == 0:
+            return float('nan')
+        rank = q / 100 * self.count
+        if rank <= self.underflow:
+            return self.min
+        cumulative = self.underflow + np.cumsum(self.counts)
+        if rank > cumulative[-1]:
+            return self.max
+        i = int(np.searchsorted(cumulative, rank))
+        below = cumulative[i] - self.counts[i]
+        fraction = (rank - below) / self.counts[i] if self.counts[i] else 0.0
+        value = self.edges[i] + fraction * (self.edges[i + 1] - self.edges[i])
+        return float(min(max(value, self.min), self.max))
+
+
+class MonteCarloEngine:
+    """
+    Monte Carlo DCF valuation
+
+    Each input returned by collect_user_inputs (plus each yearly growth rate)
+    can be a Distribution or a fixed float. Draws are sampled and valued in
+    chunks of `chunk_size`, and only running statistics are kept between
+    chunks, so peak memory depends on the chunk size, not the draw count.
+
+    With `dtype` float32 draws are still generated in float64 (so the random
+    streams match a float64 run) but valued in float32; the summary
+    statistics are accumulated in float64 either way.
+
+    `terminal_method`, `exit_metric`, `mid_year` and `stub_fraction` are
+    passed to BatchDCFEngine; exit_multiple, da_margin and blend_weight may
+    also have distributions.
+    """
+
+    def __init__(
+        self,
+        distributions: Dict[str, Union[InputSpec, Sequence[InputSpec]]],
+        chunk_size: int = 250_000,
+        bins: int = 2000,
+        hist_range: Optional[Tuple[float, float]] = None,
+        dtype: np.dtype = np.float64,
+        terminal_method: str = 'perpetuity',
+        exit_metric: str = 'ebit',
+        mid_year: bool = False,
+        stub_fraction: float = 1.0
+    ):
+        missing = [name for name in SCALAR_INPUTS + ('growth_rates',) if name not in distributions]
+        if missing:
+            raise ValueError(f"Missing distributions for: {', '.join(missing)}")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        check_terminal_method(terminal_method, exit_metric)
+        self.scalar_specs = {name: _as_distribution(distributions[name]) for name in SCALAR_INPUTS}
+        self.scalar_specs.update({
+            name: _as_distribution(distributions.get(name, default))
+            for name, default in OPTIONAL_INPUTS.items()
+        })
+        self.growth_specs = [_as_distribution(spec) for spec in distributions['growth_rates']]
+        self.chunk_size = chunk_size
+        self.bins = bins
+        self.hist_range = hist_range
+        self.dtype = check_dtype(dtype)
+        self.terminal_method = terminal_method
+        self.exit_metric = exit_metric
+        self.mid_year = mid_year
+        self.stub_fraction = stub_fraction
+
+    @classmethod
+    def from_model_params(
+        cls,
+        model_params: Dict,
+        overrides: Dict[str, Union[InputSpec, Sequence[InputSpec]]],
+        **kwargs
+    ) -> "MonteCarloEngine":
+        """Fix every input at its value in `model_params` except those in `overrides`"""
+        distributions = {
+            name: model_params[name]
+            for name in SCALAR_INPUTS + tuple(OPTIONAL_INPUTS)
+            if model_params.get(name) is not None
+        }
+        distributions.setdefault('fcf_conversion', model_input(model_params, 'fcf_conversion'))
+        for name in ('terminal_method', 'exit_metric', 'mid_year', 'stub_fraction'):
+            if model_params.get(name) is not None:
+                kwargs.setdefault(name, model_params[name])
+        distributions['growth_rates'] = extend_growth_rates(model_params['growth_rates'], model_input(model_params, 'forecast_years'))
+        distributions.update(overrides)
+        return cls(distributions, **kwargs)
+
+    def sample_inputs(self, rng: np.random.Generator, size: int) -> Dict[str, np.ndarray]:
+        """Draw one chunk of inputs, as BatchDCFEngine keyword arrays"""
+        inputs = {name: spec.sample(rng, size).astype(self.dtype, copy=False) for name, spec in self.scalar_specs.items()}
+        growth_rates = np.empty((size, len(self.growth_specs)), dtype=self.dtype)
+        for year, spec in enumerate(self.growth_specs):
+            growth_rates[:, year] = spec.sample(rng, size)
+        inputs['growth_rates'] = growth_rates
+        return inputs
+
+    def evaluate_chunk(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """
+        Sample and value one chunk, returning enterprise values
+        Draws with WACC at or below terminal growth are returned as NaN unless
+        the terminal value is purely an exit multiple
+        """
+        inputs = self.sample_inputs(rng, size)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = BatchDCFEngine(
+                dtype=self.dtype,
+                terminal_method=self.terminal_method,
+                exit_metric=self.exit_metric,
+                mid_year=self.mid_year,
+                stub_fraction=self.stub_fraction,
+                **inputs
+            ).enterprise_value()
+        if self.terminal_method != 'exit_multiple':
+            values[inputs['wacc'] <= inputs['terminal_growth']] = np.nan
+        return values
+
+    def chunk_sizes(self, n_draws: int) -> List[int]:
+        """Split `n_draws` into fixed-size chunks"""
+        full, remainder = divmod(n_draws, self.chunk_size)
+        return [self.chunk_size] * full + ([remainder] if remainder else [])
+
+    def histogram_edges(self, entropy: int) -> np.ndarray:
+        """Bin edges from `hist_range`, or from a pilot sample if none was given"""
+        if self.hist_range is not None:
+            low, high = self.hist_range
+        else:
+            pilot = self.evaluate_chunk(chunk_rng(entropy, None), min(self.chunk_size, 100_000))
+            pilot = pilot[np.isfinite(pilot)]
+            if pilot.size == 0:
+                raise ValueError("No valid draws: WACC is at or below terminal growth everywhere")
+            low, high = np.percentile(pilot, [0.01, 99.99])
+            pad = 0.25 * (high - low) or max(abs(low), 1.0) * 0.01
+            low, high = low - pad, high + pad
+        return np.linspace(low, high, self.bins + 1)
+
+    def simulate_chunk(self, entropy: int, index: int, size: int, edges: np.ndarray) -> StreamingStats:
+        """Value one chunk of draws and summarize it"""
+        stats = StreamingStats(edges)
+        stats.update(self.evaluate_chunk(chunk_rng(entropy, index), size))
+        return stats
+
+    def run(
+        self,
+        n_draws: int,
+        seed: Optional[int] = None,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        workers: Optional[int] = 1
+    ) -> Dict:
+        """
+        Simulate `n_draws` valuations
+        Returns EV mean, standard deviation, extremes, percentiles and histogram
+
+        With `workers` > 1 (None for all cores) chunks are spread across a
+        process pool. Chunk summaries are merged in chunk order, so results
+        are bit-identical for any worker count.
+        """
+        if n_draws < 1:
+            raise ValueError("n_draws must be positive")
+        entropy = np.random.SeedSequence(seed).entropy
+        edges = self.histogram_edges(entropy)
+        chunks = list(enumerate(self.chunk_sizes(n_draws)))
+        workers = workers or os.cpu_count() or 1
+
+        stats = StreamingStats(edges)
+        if workers == 1 or len(chunks) == 1:
+            for index, size in chunks:
+                stats.merge(self.simulate_chunk(entropy, index, size, edges))
+        else:
+            for chunk_stats in self._run_parallel(entropy, chunks, edges, workers):
+                stats.merge(chunk_stats)
+
+        return summarize(stats, n_draws, percentiles)
+
+    def _run_parallel(
+        self,
+        entropy: int,
+        chunks: List[Tuple[int, int]],
+        edges: np.ndarray,
+        workers: int
+    ):
+        """Yield per-chunk summaries in chunk order as the process pool completes them"""
+        # A few tasks per worker keeps the pool balanced without shipping
+        # every chunk separately
+        n_tasks = min(len(chunks), workers * 4)
+        tasks = [list(block) for block in np.array_split(np.arange(len(chunks)), n_tasks)]
+
+        pending = {}
+        next_index = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_simulate_chunks, self, entropy, [chunks[i] for i in task], edges)
+                for task in tasks
+            ]
+            for future in as_completed(futures):
+                for index, chunk_stats in future.result():
+                    pending[index] = chunk_stats
+                while next_index in pending:
+                    yield pending.pop(next_index)
+                    next_index += 1
+
+
+def _simulate_chunks(
+    engine: MonteCarloEngine,
+    entropy: int,
+    chunks: List[Tuple[int, int]],
+    edges: np.ndarray
+) -> List[Tuple[int, StreamingStats]]:
+    """Process pool task: summarize a block of chunks"""
+    return [(index, engine.simulate_chunk(entropy, index, size, edges)) for index, size in chunks]
+
+
+def chunk_rng(entropy: int, index: Optional[int]) -> np.random.Generator:
+    """
+    Independent generator for one chunk of draws
+    Each chunk's stream depends only on the root entropy and its index;
+    index None gives the pilot stream used to size the histogram
+    """
+    spawn_key = (0,) if index is None else (1, index)
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=spawn_key))
+
+
+def summarize(stats: StreamingStats, n_draws: int, percentiles: Sequence[float]) -> Dict:
+    """Convert running statistics to the Monte Carlo result dictionary"""
+    return {
+        'n_draws': n_draws,
+        'n_valid': stats.count,
+        'n_invalid': stats.n_invalid,
+        'mean': stats.mean,
+        'std': stats.std,
+        'min': stats.min,
+        'max': stats.max,
+        'percentiles': {q: stats.percentile(q) for q in percentiles},
+        'histogram': {
+            'counts': stats.counts,
+            'edges': stats.edges,
+            'underflow': stats.underflow,
+            'overflow': stats.overflow
+        }
+    }
+
+
+def _as_distribution(spec: InputSpec) -> Distribution:
+    """Wrap plain numbers as fixed distributions"""
+    return spec if isinstance(spec, Distribution) else Distribution.fixed(float(spec))
@@ -0,0 +1,367 @@
+"""
+Streaming Valuation Pipeline
+Chunked read -> validate -> value -> write over files of any size
+"""
+
+import os
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .batch_engine import BatchDCFEngine
+from .results import SERIES_FIELDS
+
+
+REQUIRED_COLUMNS = ('current_revenue', 'ebit_margin', 'tax_rate', 'wacc', 'terminal_growth')
+
+# Optional per-row inputs and their defaults
+OPTIONAL_COLUMNS = {
+    'fcf_conversion': 0.8,
+    'exit_multiple': np.nan,
+    'da_margin': 0.0,
+    'blend_weight': 0.5
+}
+
+# Yearly growth rates are columns growth_1, growth_2, ...
+GROWTH_COLUMN = re.compile(r'^growth_(\d+)$')
+
+OUTPUT_COLUMNS = (
+    'enterprise_value',
+    'pv_forecast_period',
+    'pv_terminal_value',
+    'terminal_value',
+    'terminal_value_perpetuity',
+    'terminal_value_exit_multiple'
+)
+
+FORMATS = ('csv', 'parquet', 'arrow')
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+class InputError(ValueError):
+    """Input file does not describe valid valuation rows"""
+
+
+def table_format(path: str, override: Optional[str] = None) -> str:
+    """File format from an explicit choice or the file extension"""
+    if override:
+        return override
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    if extension in ('.arrow', '.feather', '.ipc'):
+        return 'arrow'
+    if extension == '.csv':
+        return 'csv'
+    raise InputError(f"Cannot tell the format of '{path}'; pass --input-format/--output-format")
+
+
+def growth_columns(columns: List[str]) -> List[str]:
+    """growth_1..growth_N in year order; years must be contiguous from 1"""
+    years = sorted(int(match.group(1)) for match in map(GROWTH_COLUMN.match, columns) if match)
+    if not years:
+        raise InputError("No growth_1..growth_N columns found")
+    if years != list(range(1, len(years) + 1)):
+        raise InputError(f"Growth columns must run from growth_1 to growth_{len(years)} without gaps")
+    return [f"growth_{year}" for year in years]
+
+
+def engine_inputs(frame: pd.DataFrame, terminal_method: str = 'perpetuity') -> Dict[str, np.ndarray]:
+    """Validate a frame and convert it to BatchDCFEngine keyword arrays"""
+    missing = [name for name in REQUIRED_COLUMNS if name not in frame.columns]
+    if missing:
+        raise InputError(f"Missing required columns: {', '.join(missing)}")
+    if terminal_method != 'perpetuity' and 'exit_multiple' not in frame.columns:
+        raise InputError(f"terminal_method '{terminal_method}' needs an exit_multiple column")
+
+    inputs = {name: frame[name].to_numpy(dtype=np.float64) for name in REQUIRED_COLUMNS}
+    for name, default in OPTIONAL_COLUMNS.items():
+        if name in frame.columns:
+            inputs[name] = frame[name].fillna(default).to_numpy(dtype=np.float64)
+        else:
+            inputs[name] = np.full(len(frame), default)
+    inputs['growth_rates'] = frame[growth_columns(list(frame.columns))].to_numpy(dtype=np.float64)
+    return inputs
+
+
+def value_chunk(
+    frame: pd.DataFrame,
+    terminal_method: str = 'perpetuity',
+    **engine_options
+) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    """
+    Value every row of `frame`
+    Returns the non-input columns of `frame` and the batch run_valuation
+    output; rows whose perpetuity value is undefined (WACC at or below
+    terminal growth) or that contain missing inputs are NaN throughout
+    """
+    inputs = engine_inputs(frame, terminal_method)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results = BatchDCFEngine(terminal_method=terminal_method, **inputs, **engine_options).run_valuation()
+
+    invalid = np.isnan(inputs['growth_rates']).any(axis=1)
+    if terminal_method != 'exit_multiple':
+        invalid |= inputs['wacc'] <= inputs['terminal_growth']
+    if invalid.any():
+        for name in OUTPUT_COLUMNS + SERIES_FIELDS:
+            results[name][invalid] = np.nan
+
+    passthrough = [
+        name for name in frame.columns
+        if name not in REQUIRED_COLUMNS and name not in OPTIONAL_COLUMNS and not GROWTH_COLUMN.match(name)
+    ]
+    return frame[passthrough].reset_index(drop=True), results
+
+
+def value_frame(frame: pd.DataFrame, **options) -> pd.DataFrame:
+    """value_chunk flattened to one frame: passthrough columns then OUTPUT_COLUMNS"""
+    output, results = value_chunk(frame, **options)
+    for name in OUTPUT_COLUMNS:
+        output[name] = results[name]
+    return output
+
+
+def read_chunks(path: str, file_format: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Yield the input file `chunk_size` rows at a time
+    A file without rows yields one empty frame with its columns, so it is
+    still validated and gets a header-only output
+    """
+    empty = True
+    for chunk in _read_chunks(path, file_format, chunk_size):
+        empty = False
+        yield chunk
+    if empty:
+        yield empty_frame(path, file_format)
+
+
+def empty_frame(path: str, file_format: str) -> pd.DataFrame:
+    """The input file's columns without any rows"""
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).empty_table().to_pandas()
+    if file_format == 'arrow':
+        import pyarrow as pa
+
+        return pa.ipc.open_file(pa.memory_map(path, 'r')).schema.empty_table().to_pandas()
+    return pd.read_csv(path, nrows=0)
+
+
+def _read_chunks(path: str, file_format: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif file_format == 'arrow':
+        yield from read_arrow_chunks(path, chunk_size)
+    else:
+        with pd.read_csv(path, chunksize=chunk_size) as reader:
+            yield from reader
+
+
+def read_arrow_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Yield an Arrow IPC file `chunk_size` rows at a time
+    The file is memory-mapped and its record batches, whatever their size,
+    are regrouped into chunks, so only one chunk is converted at a time
+    """
+    import pyarrow as pa
+
+    reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+    pending, rows = [], 0
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pa.Table.from_batches(pending, reader.schema)
+            yield table.slice(0, chunk_size).to_pandas()
+            rest = table.slice(chunk_size)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending, reader.schema).to_pandas()
+
+
+class ChunkWriter:
+    """
+    Append valued chunks to a CSV, Parquet or Arrow IPC file as they arrive
+    Parquet and Arrow output get one row group (record batch) per chunk,
+    with the schema fixed by the first chunk, and can carry the per-year
+    series as fixed-size-list columns; CSV holds the scalar outputs only
+    """
+
+    def __init__(self, path: str, file_format: str, series: bool = False):
+        if series and file_format == 'csv':
+            raise InputError("Per-year series need Parquet or Arrow output")
+        self.path = path
+        self.file_format = file_format
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        if file_format != 'csv':
+            from .columnar import ResultsWriter
+
+            self._writer = ResultsWriter(path, file_format, SERIES_FIELDS if series else ())
+
+    def write(self, columns: pd.DataFrame, results: Dict[str, np.ndarray]):
+        """Append one chunk of passthrough columns and valuation results"""
+        if self._writer is not None:
+            self._writer.write({name: results[name] for name in OUTPUT_COLUMNS + self._writer.series}, columns)
+        else:
+            frame = columns.copy()
+            for name in OUTPUT_COLUMNS:
+                frame[name] = results[name]
+            if self._file is None:
+                self._file = open(self.path, 'w', newline='')
+            frame.to_csv(self._file, header=self.rows == 0, index=False)
+        self.rows += len(columns)
+
+    def close(self):
+        """Finish the file"""
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def prefetch(iterable: Iterable, depth: int) -> Iterator:
+    """
+    Run `iterable` on a background thread, at most `depth` items ahead
+    The bounded queue caps how many chunks are in memory at once; errors
+    raised by the producer are re-raised in the consumer
+    """
+    items = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def put(entry) -> bool:
+        """Queue an entry unless the consumer has gone away"""
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as error:
+            put((done, error))
+        finally:
+            # Shuts down an upstream prefetch stage as well
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # Unblock the producer if the consumer stops early
+        stop.set()
+        thread.join()
+
+
+def timed(iterable: Iterable, stats: Dict[str, float], key: str) -> Iterator:
+    """Add the time spent producing each item of `iterable` to stats[key]"""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats[key] += time.perf_counter() - start
+            return
+        stats[key] += time.perf_counter() - start
+        yield item
+
+
+def timed_map(func: Callable, iterable: Iterable, stats: Dict[str, float], key: str) -> Iterator:
+    """Apply `func` to each item, adding only the time spent in `func` to stats[key]"""
+    for item in iterable:
+        start = time.perf_counter()
+        result = func(item)
+        stats[key] += time.perf_counter() - start
+        yield result
+
+
+def run_pipeline(
+    input_path: str,
+    output_path: str,
+    input_format: Optional[str] = None,
+    output_format: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    prefetch_depth: int = 2,
+    series: bool = False,
+    **options
+) -> Dict:
+    """
+    Stream `input_path` through validation and valuation into `output_path`
+
+    Only a bounded number of chunks exist at once, so peak memory depends on
+    `chunk_size`, not the file size. With `prefetch_depth` > 0, reading,
+    valuing and writing run on separate threads connected by queues of that
+    depth; 0 runs every stage inline. `series` also stores the per-year
+    outputs (Parquet or Arrow only). Options go to value_chunk.
+
+    Returns row, chunk and invalid-row counts, the busy time of each stage
+    and the wall-clock total.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    input_format = table_format(input_path, input_format)
+    output_format = table_format(output_path, output_format)
+    stats = {'read': 0.0, 'value': 0.0, 'write': 0.0}
+    chunks = 0
+    invalid = 0
+
+    start = time.perf_counter()
+    stream = timed(read_chunks(input_path, input_format, chunk_size), stats, 'read')
+    if prefetch_depth:
+        stream = prefetch(stream, prefetch_depth)
+    stream = timed_map(lambda chunk: value_chunk(chunk, **options), stream, stats, 'value')
+    if prefetch_depth:
+        stream = prefetch(stream, prefetch_depth)
+
+    try:
+        with ChunkWriter(output_path, output_format, series) as writer:
+            for columns, results in stream:
+                write_start = time.perf_counter()
+                writer.write(columns, results)
+                stats['write'] += time.perf_counter() - write_start
+                chunks += len(columns) > 0
+                invalid += int(np.isnan(results['enterprise_value']).sum())
+    finally:
+        stream.close()
+
+    return {
+        'rows': writer.rows,
+        'chunks': chunks,
+        'invalid': invalid,
+        'seconds': {**stats, 'total': time.perf_counter() - start}
+    }
@@ -0,0 +1,261 @@
+"""
+Valuation Result Cache
+Two-tier (memory LRU + optional shared disk) cache of valuation results
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .dcf_model import ENGINE_VERSION
+
+
+class ValuationCache:
+    """
+    Cache of valuation outputs keyed on a canonical hash of the model parameters
+
+    Values are held pickled, so every lookup returns a private copy that
+    callers may mutate freely. The memory tier is an LRU bounded by entry
+    count and pickled size. The optional disk tier stores one pickle per key
+    under `disk_dir/v<engine version>/`, so several server processes can
+    share results. Entries written by other engine versions are never read;
+    those of older versions are purged on start, while newer ones are left
+    for the processes that wrote them during a rolling deploy.
+
+    Unpickling runs code, so the disk tier must only be writable by the
+    user running the app: `disk_dir` is created private (0700), an existing
+    one owned by another user or writable by group/others is rejected with
+    PermissionError, and entry files failing the same check are ignored.
+
+    With `ttl` set, entries older than that many seconds are treated as
+    misses in both tiers (disk age comes from the file's mtime), so a
+    long-lived server picks up results recomputed after a data or engine
+    fix instead of serving the first answer forever.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        engine_version: str = ENGINE_VERSION,
+        ttl: Optional[float] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.engine_version = engine_version
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.metrics = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'stale_versions_purged': 0,
+            'untrusted_skipped': 0
+        }
+
+        self.disk_dir = None
+        if disk_dir is not None:
+            self.disk_dir = os.path.join(disk_dir, f"v{engine_version}")
+            make_private_dir(self.disk_dir)
+            check_trusted_dir(disk_dir)
+            check_trusted_dir(self.disk_dir)
+            self._purge_stale_versions(disk_dir)
+
+    def key(self, params: Dict, namespace: str = 'valuation') -> str:
+        """Canonical SHA-256 key for a parameter dictionary"""
+        payload = json.dumps(
+            {'namespace': namespace, 'engine_version': self.engine_version, 'params': _canonical(params)},
+            sort_keys=True,
+            separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, params: Dict, namespace: str = 'valuation') -> Optional[Any]:
+        """Cached value for `params`, or None on a miss"""
+        key = self.key(params, namespace)
+        with self._lock:
+            if key in self._entries:
+                stored_at, blob = self._entries[key]
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self.metrics['hits'] += 1
+                    self.metrics['memory_hits'] += 1
+                    return pickle.loads(blob)
+                self._bytes -= len(self._entries.pop(key)[1])
+                self.metrics['expired'] += 1
+
+        stored_at, blob = self._read_disk(key)
+        with self._lock:
+            if blob is None:
+                self.metrics['misses'] += 1
+                return None
+            self.metrics['hits'] += 1
+            self.metrics['disk_hits'] += 1
+            self._store(key, blob, stored_at)
+        return pickle.loads(blob)
+
+    def put(self, params: Dict, value: Any, namespace: str = 'valuation'):
+        """Store a value in memory and, if configured, on disk"""
+        key = self.key(params, namespace)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, blob, time.time())
+        self._write_disk(key, blob)
+
+    def get_or_compute(
+        self,
+        params: Dict,
+        compute: Callable[[], Any],
+        namespace: str = 'valuation'
+    ) -> Any:
+        """Return the cached value for `params`, computing and storing it on a miss"""
+        value = self.get(params, namespace)
+        if value is None:
+            value = compute()
+            self.put(params, value, namespace)
+        return value
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.disk_dir is not None:
+            shutil.rmtree(self.disk_dir, ignore_errors=True)
+            make_private_dir(self.disk_dir)
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters plus current memory-tier size"""
+        with self._lock:
+            lookups = self.metrics['hits'] + self.metrics['misses']
+            return {
+                **self.metrics,
+                'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+    def _store(self, key: str, blob: bytes, stored_at: float):
+        """Insert into the memory tier and evict least recently used entries; caller holds the lock"""
+        if len(blob) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key)[1])
+        self._entries[key] = (stored_at, blob)
+        self._bytes += len(blob)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.metrics['evictions'] += 1
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Tuple[Optional[float], Optional[bytes]]:
+        """Write time and pickled value of a disk entry, or (None, None) if unusable"""
+        if self.disk_dir is None:
+            return None, None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                stat = os.fstat(f.fileno())
+                if not _trusted(stat):
+                    skipped = 'untrusted_skipped'
+                elif self._expired(stat.st_mtime):
+                    skipped = 'expired'
+                else:
+                    return stat.st_mtime, f.read()
+        except OSError:
+            return None, None
+        with self._lock:
+            self.metrics[skipped] += 1
+        return None, None
+
+    def _write_disk(self, key: str, blob: bytes):
+        """Write atomically so concurrent readers never see a partial file"""
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        make_private_dir(os.path.dirname(path))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _purge_stale_versions(self, root: str):
+        """
+        Remove disk entries written by older engine versions
+        Newer versions belong to processes already upgraded in a rolling
+        deploy and are left alone, as are names that are not plain versions
+        """
+        current = _version_number(self.engine_version)
+        if current is None:
+            return
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            version = _version_number(name[1:]) if name.startswith('v') else None
+            if version is not None and version < current and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                self.metrics['stale_versions_purged'] += 1
+
+
+def make_private_dir(path: str):
+    """Create a directory (and missing parents) readable and writable by this user only"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+
+
+def check_trusted_dir(path: str):
+    """Refuse a cache directory that someone other than this user could write to"""
+    if not _trusted(os.stat(path)):
+        raise PermissionError(
+            f"Cache directory '{path}' must be owned by the current user and not writable by group or others"
+        )
+
+
+def _trusted(stat: os.stat_result) -> bool:
+    """Owned by this user and not group/world-writable (always true where there are no uids)"""
+    if not hasattr(os, 'getuid'):
+        return True
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def _version_number(version: str) -> Optional[int]:
+    """Engine version as an integer, or None for anything else"""
+    return int(version) if version.isdigit() else None
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-ready form with numbers normalised, so equal parameters hash equally"""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
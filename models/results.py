@@ -0,0 +1,134 @@
+"""
+Valuation Results
+Compact result container with a dict-compatible view
+"""
+
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, Iterator, Sequence
+
+
+SERIES_FIELDS = ('revenues', 'ebits', 'nopats', 'fcfs', 'discount_factors', 'pv_fcfs')
+
+SCALAR_FIELDS = (
+    'terminal_value',
+    'pv_terminal_value',
+    'pv_forecast_period',
+    'enterprise_value',
+    'current_revenue',
+    'terminal_value_perpetuity',
+    'terminal_value_exit_multiple'
+)
+
+SERIES_DTYPE = np.dtype([(name, np.float64) for name in SERIES_FIELDS])
+
+
+class ValuationResult(Mapping):
+    """
+    Output of one DCF valuation
+
+    Per-year series live in a single contiguous structured array (one record
+    per year) and scalars in slots, so a result costs a few hundred bytes
+    instead of a dict of Python lists. Indexing by the familiar
+    run_valuation keys returns array views for series and floats for
+    scalars; to_dict() gives the original dict-of-lists form.
+    """
+
+    __slots__ = ('series',) + SCALAR_FIELDS
+
+    def __init__(
+        self,
+        series: np.ndarray,
+        terminal_value: float,
+        pv_terminal_value: float,
+        pv_forecast_period: float,
+        enterprise_value: float,
+        current_revenue: float = float('nan'),
+        terminal_value_perpetuity: float = float('nan'),
+        terminal_value_exit_multiple: float = float('nan')
+    ):
+        if series.dtype != SERIES_DTYPE:
+            raise TypeError("series must use SERIES_DTYPE")
+        self.series = series
+        self.terminal_value = float(terminal_value)
+        self.pv_terminal_value = float(pv_terminal_value)
+        self.pv_forecast_period = float(pv_forecast_period)
+        self.enterprise_value = float(enterprise_value)
+        self.current_revenue = float(current_revenue)
+        self.terminal_value_perpetuity = float(terminal_value_perpetuity)
+        self.terminal_value_exit_multiple = float(terminal_value_exit_multiple)
+
+    @classmethod
+    def from_series(cls, series: Dict[str, Sequence[float]], **scalars: float) -> "ValuationResult":
+        """Build from per-year sequences keyed by SERIES_FIELDS plus scalar keywords"""
+        records = np.empty(len(series['revenues']), dtype=SERIES_DTYPE)
+        for name in SERIES_FIELDS:
+            records[name] = series[name]
+        return cls(records, **scalars)
+
+    @classmethod
+    def from_batch(cls, batch_results: Dict[str, np.ndarray], index: int, current_revenue: float = float('nan')) -> "ValuationResult":
+        """Extract one scenario from BatchDCFEngine.run_valuation output"""
+        return cls.from_series(
+            {name: batch_results[name][index] for name in SERIES_FIELDS},
+            current_revenue=current_revenue,
+            **{name: batch_results[name][index] for name in SCALAR_FIELDS if name in batch_results}
+        )
+
+    @property
+    def years(self) -> int:
+        """Number of projected years"""
+        return len(self.series)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the per-year series"""
+        return self.series.nbytes
+
+    def __getitem__(self, key: str):
+        if key in SERIES_FIELDS:
+            return self.series[key]
+        if key in SCALAR_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: float):
+        """Scalars may be overwritten (e.g. current_revenue); series are fixed"""
+        if key not in SCALAR_FIELDS:
+            raise KeyError(f"Cannot assign '{key}' on a ValuationResult")
+        setattr(self, key, float(value))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SERIES_FIELDS + SCALAR_FIELDS)
+
+    def __len__(self) -> int:
+        return len(SERIES_FIELDS) + len(SCALAR_FIELDS)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ValuationResult):
+            return NotImplemented
+        scalars = np.array([getattr(self, name) for name in SCALAR_FIELDS])
+        other_scalars = np.array([getattr(other, name) for name in SCALAR_FIELDS])
+        return np.array_equal(self.series, other.series) and np.array_equal(scalars, other_scalars, equal_nan=True)
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+    def to_dict(self) -> Dict:
+        """Original run_valuation format: lists for series, floats for scalars"""
+        return {
+            **{name: self.series[name].tolist() for name in SERIES_FIELDS},
+            **{name: getattr(self, name) for name in SCALAR_FIELDS}
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"ValuationResult(years={self.years}, enterprise_value={self.enterprise_value:.4f}, "
+            f"pv_terminal_value={self.pv_terminal_value:.4f})"
+        )
@@ -0,0 +1,384 @@
+"""
+Sensitivity Engine
+One-at-a-time (tornado) sensitivity and N-dimensional sensitivity cubes,
+evaluated as batches
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .batch_engine import (
+    BatchDCFEngine,
+    check_dtype,
+    check_factorizable,
+    discount_kernel,
+    discount_schedule,
+    extend_growth_rates
+)
+from .dcf_model import model_input
+
+
+SCALAR_INPUT_LABELS = {
+    'current_revenue': "Current Revenue",
+    'ebit_margin': "EBIT Margin",
+    'tax_rate': "Tax Rate",
+    'wacc': "WACC",
+    'terminal_growth': "Terminal Growth",
+    'fcf_conversion': "FCF Conversion"
+}
+
+
+# Terminal value and discounting options passed through to BatchDCFEngine unchanged
+ENGINE_OPTIONS = ('terminal_method', 'exit_metric', 'da_margin', 'blend_weight', 'mid_year', 'stub_fraction')
+
+
+def engine_options(model_params: Dict) -> Dict:
+    """Terminal value and discounting keyword arguments for BatchDCFEngine from DCFModel parameters"""
+    options = {name: model_params[name] for name in ENGINE_OPTIONS if model_params.get(name) is not None}
+    if model_params.get('exit_multiple') is not None:
+        options['exit_multiple'] = model_params['exit_multiple']
+    return options
+
+
+def model_growth_rates(model_params: Dict) -> List[float]:
+    """Growth path of a DCFModel parameter dictionary over its forecast horizon"""
+    return extend_growth_rates(model_params['growth_rates'], model_input(model_params, 'forecast_years'))
+
+
+def tornado_inputs(model_params: Dict) -> List[Tuple[str, str, Optional[int]]]:
+    """(label, parameter name, growth year index) for every perturbed input"""
+    inputs = [("Current Revenue", 'current_revenue', None)]
+    inputs += [
+        (f"Year {year + 1} Growth", 'growth_rates', year)
+        for year in range(len(model_growth_rates(model_params)))
+    ]
+    inputs += [
+        (label, name, None)
+        for name, label in SCALAR_INPUT_LABELS.items()
+        if name != 'current_revenue'
+    ]
+    if model_input(model_params, 'terminal_method') != 'perpetuity':
+        inputs.append(("Exit Multiple", 'exit_multiple', None))
+    return inputs
+
+
+def tornado_analysis(
+    model_params: Dict,
+    delta: float = 0.10,
+    relative: bool = True,
+    deltas: Optional[Dict[str, float]] = None,
+    zero_base_shift: float = 0.01
+) -> Dict:
+    """
+    Move each input down and up by `delta`, holding the others at base
+
+    With `relative` the shift is `delta` times the base value, otherwise it
+    is an absolute amount. A relative shift of a zero base (say 0% growth)
+    would be zero, so such inputs move by `zero_base_shift` instead, one
+    percentage point by default. `deltas` overrides the shift per parameter name
+    (growth years share the 'growth_rates' entry). All 2 x K perturbed
+    scenarios are valued in one BatchDCFEngine call.
+
+    Returns the base EV and one row per input, sorted by descending swing.
+    """
+    deltas = deltas or {}
+    inputs = tornado_inputs(model_params)
+    n_inputs = len(inputs)
+
+    base_growth = np.asarray(model_growth_rates(model_params), dtype=np.float64)
+    options = engine_options(model_params)
+    base_scalars = {
+        name: float(model_input(model_params, name))
+        for name in SCALAR_INPUT_LABELS
+    }
+    if 'exit_multiple' in options:
+        base_scalars['exit_multiple'] = float(options.pop('exit_multiple'))
+
+    # Row 0 is the base case, rows 1..K move inputs down, K+1..2K move them up
+    n_rows = 2 * n_inputs + 1
+    scalars = {name: np.full(n_rows, value) for name, value in base_scalars.items()}
+    growth_rates = np.tile(base_growth, (n_rows, 1))
+    input_values = np.empty((n_inputs, 2))
+
+    for i, (_, name, year) in enumerate(inputs):
+        base = base_growth[year] if year is not None else base_scalars[name]
+        shift = deltas.get(name, delta)
+        if relative:
+            shift = shift * abs(base) if base != 0 else zero_base_shift
+        low, high = base - shift, base + shift
+        input_values[i] = low, high
+
+        target = growth_rates[:, year] if year is not None else scalars[name]
+        target[1 + i] = low
+        target[1 + n_inputs + i] = high
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = BatchDCFEngine(growth_rates=growth_rates, **scalars, **options).enterprise_value()
+    # The Gordon formula is meaningless once WACC no longer exceeds terminal growth
+    if options.get('terminal_method', 'perpetuity') != 'exit_multiple':
+        values[scalars['wacc'] <= scalars['terminal_growth']] = np.nan
+
+    base_value = float(values[0])
+    rows = []
+    for i, (label, name, year) in enumerate(inputs):
+        low_ev, high_ev = float(values[1 + i]), float(values[1 + n_inputs + i])
+        rows.append({
+            'label': label,
+            'parameter': name,
+            'year': year,
+            'low_input': float(input_values[i, 0]),
+            'high_input': float(input_values[i, 1]),
+            'low_ev': low_ev,
+            'high_ev': high_ev,
+            'swing': abs(high_ev - low_ev)
+        })
+    rows.sort(key=lambda row: -row['swing'] if np.isfinite(row['swing']) else np.inf)
+
+    return {'base_value': base_value, 'rows': rows}
+
+
+# Axes a SensitivityCube can sweep: every scalar model input, plus a
+# parallel shift applied to all yearly growth rates
+CUBE_AXIS_LABELS = {
+    **SCALAR_INPUT_LABELS,
+    'growth_shift': "Growth Shift"
+}
+
+# Inputs that scale EV multiplicatively (tax through 1 - tax_rate); every
+# other axis only enters the discounting kernel
+LINEAR_AXES = ('current_revenue', 'ebit_margin', 'tax_rate', 'fcf_conversion')
+
+
+def linear_factor(name: str, values: np.ndarray) -> np.ndarray:
+    """Multiplier a linear input contributes to EV"""
+    return 1 - values if name == 'tax_rate' else values
+
+
+def factorized_sweep(
+    model_params: Dict,
+    current_revenue: Optional[Sequence[float]] = None,
+    ebit_margin: Optional[Sequence[float]] = None,
+    tax_rate: Optional[Sequence[float]] = None,
+    fcf_conversion: Optional[Sequence[float]] = None,
+    dtype: np.dtype = np.float64
+) -> np.ndarray:
+    """
+    EV over every combination of the given linear inputs
+    The discounting kernel is computed once for the model's growth path,
+    WACC and terminal growth, then scaled by an outer product of the linear
+    factors. Returns an array of `dtype` with one dimension per input given,
+    in argument order; omitted inputs stay at their model value. Only the
+    perpetuity terminal method factorizes this way.
+    """
+    check_factorizable(model_input(model_params, 'terminal_method'))
+    dtype = check_dtype(dtype)
+    kernel = discount_kernel(
+        np.asarray(model_growth_rates(model_params), dtype=dtype),
+        model_params['wacc'],
+        model_params['terminal_growth'],
+        model_discount_schedule(model_params)
+    )[0]
+    swept = {
+        'current_revenue': current_revenue,
+        'ebit_margin': ebit_margin,
+        'tax_rate': tax_rate,
+        'fcf_conversion': fcf_conversion
+    }
+
+    values = np.asarray(kernel)
+    for name in LINEAR_AXES:
+        if swept[name] is None:
+            base = model_input(model_params, name)
+            values = values * dtype.type(linear_factor(name, base))
+        else:
+            values = np.multiply.outer(values, linear_factor(name, np.asarray(swept[name], dtype=dtype)))
+    return values
+
+
+class SensitivityCube:
+    """
+    Enterprise value over the Cartesian product of any subset of inputs
+
+    Inputs without an axis stay at their `model_params` value. The cube is
+    evaluated on first access, in chunks of `chunk_size` cells, so per-year
+    arrays only ever exist for one chunk. Slices are views into the stored
+    cube and marginal summaries are computed once on request, so pivoting a
+    heatmap to a different pair of axes never re-values anything. Cubes
+    rely on the discounting-kernel factorization, so the model must use the
+    perpetuity terminal method.
+
+    `dtype` float32 halves the cube's memory; cells then agree with float64
+    to roughly 1e-6 relative, worse where WACC is close to terminal growth.
+    """
+
+    def __init__(
+        self,
+        model_params: Dict,
+        axes: Dict[str, Sequence[float]],
+        chunk_size: int = 262_144,
+        dtype: np.dtype = np.float64
+    ):
+        unknown = set(axes) - set(CUBE_AXIS_LABELS)
+        if unknown:
+            raise ValueError(f"Unknown cube axes: {', '.join(sorted(unknown))}")
+        if not axes:
+            raise ValueError("A sensitivity cube needs at least one axis")
+        check_factorizable(model_input(model_params, 'terminal_method'))
+
+        self.model_params = model_params
+        self.axis_names = list(axes)
+        self.axes = {name: np.asarray(values, dtype=np.float64).ravel() for name, values in axes.items()}
+        self.chunk_size = chunk_size
+        self.dtype = check_dtype(dtype)
+        self._values = None
+        self._marginals = {}
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Cube shape, one dimension per axis in `axis_names` order"""
+        return tuple(len(self.axes[name]) for name in self.axis_names)
+
+    @property
+    def values(self) -> np.ndarray:
+        """Full EV cube, evaluated on first access"""
+        if self._values is None:
+            self._values = self._evaluate()
+        return self._values
+
+    def evaluate(self) -> "SensitivityCube":
+        """Force evaluation now instead of on first access; returns the cube"""
+        self.values
+        return self
+
+    def base_value(self, name: str) -> float:
+        """Model value of an axis input (0 for growth_shift)"""
+        if name == 'growth_shift':
+            return 0.0
+        return float(model_input(self.model_params, name))
+
+    def slice(
+        self,
+        x_axis: str,
+        y_axis: str,
+        at: Optional[Dict[str, float]] = None
+    ) -> np.ndarray:
+        """
+        2-D view of the cube, shape (len(y_axis values), len(x_axis values))
+        Every other axis is fixed at the grid point nearest its value in `at`,
+        or nearest the base model value if not given
+        """
+        if x_axis == y_axis:
+            raise ValueError("Slice axes must differ")
+        at = at or {}
+        index = []
+        for name in self.axis_names:
+            if name in (x_axis, y_axis):
+                index.append(slice(None))
+            else:
+                target = at.get(name, self.base_value(name))
+                index.append(int(np.argmin(np.abs(self.axes[name] - target))))
+        plane = self.values[tuple(index)]
+        # Remaining dimensions follow axis_names order; put y first
+        if self.axis_names.index(x_axis) < self.axis_names.index(y_axis):
+            plane = plane.T
+        return plane
+
+    def marginal(self, axis: str, statistic: str = 'mean') -> np.ndarray:
+        """EV summarized over every other axis, one value per point of `axis`"""
+        reducers = {'mean': np.nanmean, 'min': np.nanmin, 'max': np.nanmax, 'std': np.nanstd}
+        if statistic not in reducers:
+            raise ValueError(f"Unknown statistic '{statistic}'")
+        key = (axis, statistic)
+        if key not in self._marginals:
+            others = tuple(i for i, name in enumerate(self.axis_names) if name != axis)
+            self._marginals[key] = reducers[statistic](self.values, axis=others) if others else self.values.copy()
+        return self._marginals[key]
+
+    def _evaluate(self) -> np.ndarray:
+        """
+        Value every cell through the factorization EV = linear factors x G
+        The kernel G is evaluated once per combination of the non-linear
+        axes (WACC, TG, growth shift), one chunk at a time, then broadcast
+        against the linear axes
+        """
+        kernel_axes = [name for name in self.axis_names if name not in LINEAR_AXES]
+        values = self._evaluate_kernel(kernel_axes)
+        # Kernel dimensions keep their relative order, so reshape slots them
+        # into place with singleton dimensions for the linear axes
+        values = values.reshape([
+            len(self.axes[name]) if name in kernel_axes else 1 for name in self.axis_names
+        ])
+
+        for name in LINEAR_AXES:
+            if name in self.axes:
+                position = self.axis_names.index(name)
+                shape = [1] * len(self.axis_names)
+                shape[position] = len(self.axes[name])
+                factor = linear_factor(name, self.axes[name]).reshape(shape).astype(self.dtype)
+            else:
+                factor = self.dtype.type(linear_factor(name, self.base_value(name)))
+            values = values * factor
+
+        return np.broadcast_to(values, self.shape).copy()
+
+    def _evaluate_kernel(self, kernel_axes: List[str]) -> np.ndarray:
+        """Discounting kernel over the product of the non-linear axes"""
+        shape = tuple(len(self.axes[name]) for name in kernel_axes)
+        n_cells = int(np.prod(shape))
+        flat = np.empty(n_cells, dtype=self.dtype)
+        base_growth = np.asarray(model_growth_rates(self.model_params), dtype=self.dtype)
+        axes = {name: self.axes[name].astype(self.dtype) for name in kernel_axes}
+        schedule = model_discount_schedule(self.model_params)
+
+        for start in range(0, n_cells, self.chunk_size):
+            stop = min(start + self.chunk_size, n_cells)
+            coords = np.unravel_index(np.arange(start, stop), shape) if shape else ()
+            wacc = np.full(stop - start, self.base_value('wacc'), dtype=self.dtype)
+            terminal_growth = np.full(stop - start, self.base_value('terminal_growth'), dtype=self.dtype)
+            growth_rates = base_growth[np.newaxis, :]
+            for name, index in zip(kernel_axes, coords):
+                if name == 'growth_shift':
+                    growth_rates = base_growth + axes[name][index][:, np.newaxis]
+                elif name == 'wacc':
+                    wacc = axes[name][index]
+                else:
+                    terminal_growth = axes[name][index]
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                chunk = discount_kernel(growth_rates, wacc, terminal_growth, schedule)
+            chunk = np.broadcast_to(chunk, (stop - start,)).copy()
+            chunk[wacc <= terminal_growth] = np.nan
+            flat[start:stop] = chunk
+
+        return flat.reshape(shape)
+
+
+def model_discount_schedule(model_params: Dict) -> Dict:
+    """Discounting convention of a DCFModel parameter dictionary"""
+    return discount_schedule(
+        len(model_growth_rates(model_params)),
+        model_input(model_params, 'mid_year'),
+        model_input(model_params, 'stub_fraction')
+    )
+
+
+def bounded_window(center: float, half_width: float, n: int, low: float, high: float) -> np.ndarray:
+    """
+    `n` evenly spaced points spanning 2 x `half_width` around `center`
+    Near a bound the window shifts to stay inside [low, high] rather than
+    clipping, so the points stay distinct
+    """
+    width = min(2 * half_width, high - low)
+    start = min(max(center - width / 2, low), high - width)
+    return np.linspace(start, start + width, n)
+
+
+def default_cube_axes(model_params: Dict) -> Dict[str, np.ndarray]:
+    """Dashboard grid: WACC x TG as before, plus margin, growth and conversion around base"""
+    return {
+        'wacc': np.linspace(0.06, 0.14, 9),
+        'terminal_growth': np.linspace(0.02, 0.05, 7),
+        'ebit_margin': bounded_window(model_params['ebit_margin'], 0.05, 5, 0.0, 1.0),
+        'growth_shift': np.linspace(-0.04, 0.04, 5),
+        'fcf_conversion': bounded_window(model_input(model_params, 'fcf_conversion'), 0.10, 5, 0.0, 1.0)
+    }
@@ -0,0 +1,180 @@
+"""
+Goal-Seek Solver
+Vectorized search for the input value that produces a target enterprise value
+"""
+
+import numpy as np
+from typing import Dict
+
+from .batch_engine import BatchDCFEngine, check_factorizable
+from .dcf_model import model_input
+
+
+# EV is proportional to these inputs (to 1 - tax_rate for tax), so each
+# has an exact closed-form solution from a single valuation
+LINEAR_INPUTS = ('current_revenue', 'ebit_margin', 'fcf_conversion', 'tax_rate')
+
+SOLVABLE_INPUTS = LINEAR_INPUTS + ('wacc', 'terminal_growth')
+
+# Discounting conventions shared by every row
+CONVENTION_INPUTS = ('mid_year', 'stub_fraction')
+
+ENGINE_INPUTS = (
+    'current_revenue',
+    'ebit_margin',
+    'tax_rate',
+    'wacc',
+    'terminal_growth',
+    'fcf_conversion'
+)
+
+
+def solve_for_ev(
+    inputs: Dict,
+    parameter: str,
+    target_ev,
+    tol: float = 1e-10,
+    max_iter: int = 100
+) -> Dict:
+    """
+    Find the value of `parameter` at which EV equals `target_ev`
+
+    `inputs` holds BatchDCFEngine keyword arguments; scalars and single
+    growth paths are broadcast against the (N,) targets. Linear inputs and
+    terminal growth are solved in closed form. WACC uses safeguarded Newton
+    steps: EV falls monotonically as WACC rises above terminal growth, so
+    each row keeps a bracket and falls back to bisection whenever a Newton
+    step leaves it. The first guess comes from the Gordon formula applied
+    to year-one cash flow.
+
+    Returns the solved values, a converged mask, the final relative
+    residuals and the iteration count. Rows with no solution (for example a
+    target below the PV of the forecast period when solving terminal
+    growth) are NaN and not converged.
+
+    The closed forms assume a perpetuity-growth terminal value, so inputs
+    using an exit-multiple or blended terminal method are rejected.
+    """
+    check_factorizable(model_input(inputs, 'terminal_method'))
+    if parameter not in SOLVABLE_INPUTS:
+        raise ValueError(f"Cannot solve for '{parameter}'; choose from {', '.join(SOLVABLE_INPUTS)}")
+
+    target_ev = np.atleast_1d(np.asarray(target_ev, dtype=np.float64))
+    conventions = {name: inputs[name] for name in CONVENTION_INPUTS if inputs.get(name) is not None}
+    inputs = _broadcast_inputs(inputs, len(target_ev))
+    if target_ev.shape[0] == 1 and inputs['wacc'].shape[0] > 1:
+        target_ev = np.broadcast_to(target_ev, inputs['wacc'].shape).copy()
+
+    base = _engine(inputs, conventions).run_valuation()
+    base_ev = base['enterprise_value']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if parameter in LINEAR_INPUTS:
+            ratio = target_ev / base_ev
+            if parameter == 'tax_rate':
+                values = 1 - (1 - inputs['tax_rate']) * ratio
+            else:
+                values = inputs[parameter] * ratio
+            iterations = 1
+        elif parameter == 'terminal_growth':
+            values = _solve_terminal_growth(inputs, base, target_ev)
+            iterations = 1
+        else:
+            values, iterations = _solve_wacc(inputs, conventions, base, target_ev, tol, max_iter)
+
+    values = np.where(np.isfinite(values), values, np.nan)
+    solved = {**inputs, parameter: np.where(np.isnan(values), inputs[parameter], values)}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        achieved = _engine(solved, conventions).enterprise_value()
+        residual = np.abs(achieved - target_ev) / np.maximum(np.abs(target_ev), 1.0)
+    converged = ~np.isnan(values) & (residual <= max(tol, 1e-9))
+    if parameter == 'terminal_growth':
+        converged &= values < inputs['wacc']
+
+    return {
+        'parameter': parameter,
+        'value': values,
+        'converged': converged,
+        'residual': np.where(np.isnan(values), np.nan, residual),
+        'iterations': iterations
+    }
+
+
+def _solve_terminal_growth(inputs: Dict, base: Dict, target_ev: np.ndarray) -> np.ndarray:
+    """
+    Invert the perpetuity formula exactly
+    The forecast-period PV does not depend on terminal growth, so the target
+    fixes the terminal value, and TV = F (1 + g) / (w - g) solves for g
+    """
+    final_fcf = base['fcfs'][:, -1]
+    terminal_discount = base['pv_terminal_value'] / base['terminal_value']
+    required_tv = (target_ev - base['pv_forecast_period']) / terminal_discount
+    values = (required_tv * inputs['wacc'] - final_fcf) / (required_tv + final_fcf)
+    return np.where(required_tv > 0, values, np.nan)
+
+
+def _solve_wacc(
+    inputs: Dict,
+    conventions: Dict,
+    base: Dict,
+    target_ev: np.ndarray,
+    tol: float,
+    max_iter: int
+):
+    """Bracketed Newton iteration on WACC for every row at once"""
+    growth = inputs['terminal_growth']
+
+    # EV -> +inf as WACC approaches terminal growth from above and falls
+    # towards zero as WACC grows, so positive targets are always bracketed
+    low = growth + 1e-12
+    high = np.maximum(growth + 1.0, 2.0)
+    feasible = target_ev > 0
+
+    year_one_fcf = base['fcfs'][:, 0]
+    wacc = np.clip(growth + year_one_fcf / target_ev, low, high)
+    wacc = np.where(np.isfinite(wacc), wacc, 0.5 * (low + high))
+
+    active = feasible.copy()
+    iterations = 0
+    while active.any() and iterations < max_iter:
+        iterations += 1
+        idx = np.flatnonzero(active)
+        trial = {name: values[idx] for name, values in inputs.items()}
+        trial['wacc'] = wacc[idx]
+        engine = _engine(trial, conventions)
+        results = engine.run_valuation()
+        error = results['enterprise_value'] - target_ev[idx]
+
+        done = np.abs(error) <= tol * np.maximum(np.abs(target_ev[idx]), 1.0)
+        # EV above target means WACC is too low
+        too_low = error > 0
+        low[idx] = np.where(too_low, wacc[idx], low[idx])
+        high[idx] = np.where(too_low, high[idx], wacc[idx])
+
+        slope = engine.calculate_gradients(results)['gradient']['wacc']
+        step = wacc[idx] - error / slope
+        inside = np.isfinite(step) & (step > low[idx]) & (step < high[idx])
+        next_wacc = np.where(inside, step, 0.5 * (low[idx] + high[idx]))
+        done |= (high[idx] - low[idx]) <= tol * np.maximum(np.abs(wacc[idx]), 1e-12)
+
+        wacc[idx] = np.where(done, wacc[idx], next_wacc)
+        active[idx[done]] = False
+
+    return np.where(feasible, wacc, np.nan), iterations
+
+
+def _broadcast_inputs(inputs: Dict, n_targets: int) -> Dict[str, np.ndarray]:
+    """Expand scalar inputs and a single growth path to a common batch size"""
+    growth_rates = np.atleast_2d(np.asarray(inputs['growth_rates'], dtype=np.float64))
+    scalars = {
+        name: np.atleast_1d(np.asarray(model_input(inputs, name), dtype=np.float64))
+        for name in ENGINE_INPUTS
+    }
+    n = max([n_targets, growth_rates.shape[0]] + [values.shape[0] for values in scalars.values()])
+    broadcast = {name: np.broadcast_to(values, (n,)).copy() for name, values in scalars.items()}
+    broadcast['growth_rates'] = np.broadcast_to(growth_rates, (n, growth_rates.shape[1])).copy()
+    return broadcast
+
+
+def _engine(inputs: Dict[str, np.ndarray], conventions: Dict) -> BatchDCFEngine:
+    return BatchDCFEngine(**{name: inputs[name] for name in ENGINE_INPUTS + ('growth_rates',)}, **conventions)
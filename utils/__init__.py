@@ -1,4 +1,20 @@
-"""Utils package"""
-from .inputs import collect_user_inputs, get_theme_toggle
+"""
+Utils package
+Exports load on first access, so Streamlit is only imported when used
+"""
+from .lazy import lazy_exports
 
-__all__ = ['collect_user_inputs', 'get_theme_toggle']
+_EXPORTS = {
+    'collect_user_inputs': '.inputs',
+    'get_theme_toggle': '.inputs',
+    'read_user_inputs': '.inputs',
+    'read_theme': '.inputs',
+    'SpanRecorder': '.instrumentation',
+    'RECORDER': '.instrumentation',
+    'counted_cache_data': '.caching',
+    'cache_counts': '.caching'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,54 @@
+"""
+Counted Streamlit Caches
+st.cache_data wrappers that count how many recomputations the cache avoided
+"""
+
+import functools
+import threading
+from typing import Callable, Dict
+
+import streamlit as st
+
+
+_lock = threading.Lock()
+_counts = {}
+
+
+def counted_cache_data(ttl: float = 3600, max_entries: int = 128) -> Callable:
+    """
+    st.cache_data with size and age bounds, counting calls and cache misses
+    Each call to the decorated function is counted; only misses reach the
+    function body, so calls minus computations is the work the cache saved.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__
+        _counts.setdefault(name, {'calls': 0, 'computed': 0})
+
+        # wraps() keeps the qualname and source Streamlit keys the cache on
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            with _lock:
+                _counts[name]['computed'] += 1
+            return func(*args, **kwargs)
+
+        cached = st.cache_data(ttl=ttl, max_entries=max_entries, show_spinner=False)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _lock:
+                _counts[name]['calls'] += 1
+            return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
+
+
+def cache_counts() -> Dict[str, Dict[str, int]]:
+    """Calls, computations and avoided recomputations per cached function"""
+    with _lock:
+        return {
+            name: {**counts, 'avoided': counts['calls'] - counts['computed']}
+            for name, counts in _counts.items()
+        }
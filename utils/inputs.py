@@ -4,102 +4,175 @@ Sidebar input collection and validation
 """
 
 import streamlit as st
-from typing import Dict, List
+from typing import Callable, Dict, Optional
 
+from models.batch_engine import extend_growth_rates
 
-def collect_user_inputs() -> Dict:
+
+DEFAULT_GROWTH_RATES = [15.0, 12.0, 10.0, 8.0, 6.0]
+
+
+def collect_user_inputs(on_change: Optional[Callable[[], None]] = None) -> Dict:
     """
     Collect all user inputs from sidebar
     Returns dictionary of model parameters
+
+    `on_change` is attached to every input except the forecast horizon,
+    which changes the set of inputs and always reruns the whole app
     """
     st.sidebar.header("Model Assumptions")
     
     # Current Revenue
-    current_revenue = st.sidebar.number_input(
+    st.sidebar.number_input(
         "Current Annual Revenue ($M)",
         min_value=1.0,
         max_value=10000.0,
         value=100.0,
         step=5.0,
-        help="Enter the company's current annual revenue in millions"
+        help="Enter the company's current annual revenue in millions",
+        key="input_current_revenue",
+        on_change=on_change
     )
     
+    # Forecast Horizon
+    forecast_years = int(st.sidebar.number_input(
+        "Forecast Horizon (Years)",
+        min_value=1,
+        max_value=30,
+        value=5,
+        step=1,
+        help="Length of the explicit forecast period",
+        key="input_forecast_years"
+    ))
+    
     # Revenue Growth Rates
     st.sidebar.subheader("Revenue Growth Rates")
-    growth_rates = []
-    default_rates = [15.0, 12.0, 10.0, 8.0, 6.0]
-    
-    for year in range(1, 6):
-        rate = st.sidebar.slider(
+    for year in range(1, min(forecast_years, len(DEFAULT_GROWTH_RATES)) + 1):
+        st.sidebar.slider(
             f"Year {year} Growth Rate",
             min_value=0.0,
             max_value=30.0,
-            value=default_rates[year-1],
+            value=DEFAULT_GROWTH_RATES[year-1],
             step=0.5,
-            format="%.1f%%"
+            format="%.1f%%",
+            key=f"input_growth_{year}",
+            on_change=on_change
+        )
+    
+    if forecast_years > len(DEFAULT_GROWTH_RATES):
+        st.sidebar.caption(
+            f"Years {len(DEFAULT_GROWTH_RATES) + 1}-{forecast_years} hold "
+            f"the Year {len(DEFAULT_GROWTH_RATES)} growth rate"
         )
-        growth_rates.append(rate / 100)
     
     # Operating Assumptions
     st.sidebar.subheader("Operating Assumptions")
     
-    ebit_margin = st.sidebar.slider(
+    st.sidebar.slider(
         "Target EBIT Margin",
         min_value=10.0,
         max_value=40.0,
         value=20.0,
         step=1.0,
-        format="%.1f%%"
-    ) / 100
+        format="%.1f%%",
+        key="input_ebit_margin",
+        on_change=on_change
+    )
     
-    tax_rate = st.sidebar.slider(
+    st.sidebar.slider(
         "Tax Rate",
         min_value=15.0,
         max_value=35.0,
         value=25.0,
         step=1.0,
-        format="%.1f%%"
-    ) / 100
+        format="%.1f%%",
+        key="input_tax_rate",
+        on_change=on_change
+    )
     
     # Valuation Parameters
     st.sidebar.subheader("Valuation Parameters")
     
-    wacc = st.sidebar.slider(
+    st.sidebar.slider(
         "WACC (Weighted Average Cost of Capital)",
         min_value=5.0,
         max_value=15.0,
         value=10.0,
         step=0.5,
-        format="%.1f%%"
-    ) / 100
+        format="%.1f%%",
+        key="input_wacc",
+        on_change=on_change
+    )
     
-    terminal_growth = st.sidebar.slider(
+    st.sidebar.slider(
         "Terminal Growth Rate",
         min_value=1.0,
         max_value=5.0,
         value=3.0,
         step=0.25,
-        format="%.2f%%"
-    ) / 100
+        format="%.2f%%",
+        key="input_terminal_growth",
+        on_change=on_change
+    )
     
-    fcf_conversion = st.sidebar.slider(
+    st.sidebar.slider(
         "FCF Conversion Rate",
         min_value=60.0,
         max_value=100.0,
         value=80.0,
         step=5.0,
         format="%.0f%%",
-        help="Percentage of NOPAT converted to Free Cash Flow"
-    ) / 100
+        help="Percentage of NOPAT converted to Free Cash Flow",
+        key="input_fcf_conversion",
+        on_change=on_change
+    )
+    
+    # Discounting Convention
+    st.sidebar.checkbox(
+        "Mid-Year Convention",
+        value=False,
+        help="Discount each year's cash flow from the middle of the year",
+        key="input_mid_year",
+        on_change=on_change
+    )
+    
+    st.sidebar.slider(
+        "Months in First Period",
+        min_value=1,
+        max_value=12,
+        value=12,
+        step=1,
+        help="Months from the valuation date to the end of Year 1; only that share of Year 1 cash flow is counted",
+        key="input_first_period_months",
+        on_change=on_change
+    )
+    
+    return read_user_inputs()
+
+
+def read_user_inputs() -> Dict:
+    """
+    Model parameters from the input widgets' session state
+    Lets fragments that rerun without the sidebar see the latest inputs
+    """
+    state = st.session_state
+    forecast_years = int(state['input_forecast_years'])
+    growth_rates = [
+        state[f'input_growth_{year}'] / 100
+        for year in range(1, min(forecast_years, len(DEFAULT_GROWTH_RATES)) + 1)
+    ]
     
     return {
-        'current_revenue': current_revenue,
-        'growth_rates': growth_rates,
-        'ebit_margin': ebit_margin,
-        'tax_rate': tax_rate,
-        'wacc': wacc,
-        'terminal_growth': terminal_growth,
-        'fcf_conversion': fcf_conversion
+        'current_revenue': state['input_current_revenue'],
+        'growth_rates': extend_growth_rates(growth_rates, forecast_years),
+        'ebit_margin': state['input_ebit_margin'] / 100,
+        'tax_rate': state['input_tax_rate'] / 100,
+        'wacc': state['input_wacc'] / 100,
+        'terminal_growth': state['input_terminal_growth'] / 100,
+        'fcf_conversion': state['input_fcf_conversion'] / 100,
+        'forecast_years': forecast_years,
+        'mid_year': state['input_mid_year'],
+        'stub_fraction': state['input_first_period_months'] / 12
     }
 
 
@@ -112,6 +185,12 @@ def get_theme_toggle() -> str:
         "Theme",
         options=["Light", "Dark"],
         index=0,
-        horizontal=True
+        horizontal=True,
+        key="theme"
     )
     return theme.lower()
+
+
+def read_theme() -> str:
+    """Selected theme from session state, for fragments that rerun without the sidebar"""
+    return st.session_state.get('theme', "Light").lower()
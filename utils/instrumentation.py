@@ -0,0 +1,110 @@
+"""
+Rerun Instrumentation
+Opt-in nested timing spans for dashboard reruns, kept in an in-process ring buffer
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+class SpanRecorder:
+    """
+    Record where each rerun spends its time
+
+    Wrap a rerun in `rerun()` and its stages in `span(name)`; spans nest, so
+    a span opened inside "charts" is recorded as "charts/<name>". Outside an
+    enabled rerun `span` is a no-op, which keeps the instrumented code free
+    to run with diagnostics off. The last `capacity` reruns are kept; spans
+    are tracked per thread, so concurrent sessions do not mix.
+    """
+
+    def __init__(self, capacity: int = 200):
+        self.reruns = deque(maxlen=capacity)
+        self._local = threading.local()
+
+    @contextmanager
+    def rerun(self, enabled: bool = True, kind: str = 'app') -> Iterator[None]:
+        """
+        Time one rerun; its spans are stored when the block exits, even on error
+        Nested inside another rerun this is a no-op, so a fragment can open
+        its own rerun for fragment-only runs and join the app's otherwise.
+        The overall time is recorded as "total" for app reruns and
+        "total[<kind>]" for anything else.
+        """
+        if not enabled or getattr(self._local, 'spans', None) is not None:
+            yield
+            return
+        total = 'total' if kind == 'app' else f'total[{kind}]'
+        self._local.stack = []
+        self._local.spans = {total: 0.0}
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            spans = self._local.spans
+            spans[total] = time.perf_counter() - start
+            self._local.spans = None
+            self.reruns.append({'timestamp': time.time(), 'kind': kind, 'spans': spans})
+
+    def span(self, name: str):
+        """Context manager timing one stage of the current rerun"""
+        if getattr(self._local, 'spans', None) is None:
+            return nullcontext()
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        stack = self._local.stack
+        stack.append(name)
+        path = "/".join(stack)
+        spans = self._local.spans
+        # Entered in start order, so paths list parents before their children
+        spans.setdefault(path, 0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # A stage that runs twice in one rerun is recorded once, with both durations
+            spans[path] += time.perf_counter() - start
+            stack.pop()
+
+    def stage_stats(self) -> List[Dict]:
+        """Count and p50 / p95 / last milliseconds per span path over the buffered reruns"""
+        durations = {}
+        for rerun in list(self.reruns):
+            for path, seconds in rerun['spans'].items():
+                durations.setdefault(path, []).append(seconds)
+
+        stats = []
+        for path, values in durations.items():
+            values = np.asarray(values)
+            p50, p95 = np.percentile(values, [50, 95])
+            stats.append({
+                'stage': path,
+                'count': len(values),
+                'p50_ms': p50 * 1e3,
+                'p95_ms': p95 * 1e3,
+                'last_ms': values[-1] * 1e3
+            })
+        return stats
+
+    def export(self, path: Optional[str] = None) -> str:
+        """Stats and raw reruns as JSON, written to `path` when given"""
+        document = json.dumps({'stages': self.stage_stats(), 'reruns': list(self.reruns)}, indent=2)
+        if path:
+            with open(path, 'w') as handle:
+                handle.write(document)
+        return document
+
+    def clear(self):
+        self.reruns.clear()
+
+
+# Shared by every session in the server process
+RECORDER = SpanRecorder()
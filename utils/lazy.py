@@ -0,0 +1,29 @@
+"""
+Lazy Package Exports
+PEP 562 module `__getattr__` / `__dir__` that import an export on first access
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(module_name: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    `__getattr__` and `__dir__` for the package `module_name`
+    `exports` maps each public name to the submodule (relative to the
+    package) that defines it. A name is imported on first access and then
+    stored in the package namespace, so later lookups skip `__getattr__`.
+    """
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        module = sys.modules[module_name]
+        value = getattr(importlib.import_module(exports[name], module_name), name)
+        setattr(module, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[module_name])) | set(exports))
+
+    return __getattr__, __dir__